@@ -0,0 +1,260 @@
+EPSILON = 'ε'
+END_MARKER = '$'
+
+
+def strongly_connected_components(nodes, edges):
+    """Tarjan's algorithm, iterative. `edges[v]` lists the successors of v.
+
+    Components come out in reverse topological order: every component is
+    emitted after all components reachable from it.
+    """
+    index = {}
+    low = {}
+    on_stack = set()
+    stack = []
+    components = []
+    counter = 0
+
+    for root in nodes:
+        if root in index:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(edges[root]))]
+        while work:
+            node, successors = work[-1]
+            for succ in successors:
+                if succ not in index:
+                    index[succ] = low[succ] = counter
+                    counter += 1
+                    stack.append(succ)
+                    on_stack.add(succ)
+                    work.append((succ, iter(edges[succ])))
+                    break
+                if succ in on_stack and index[succ] < low[node]:
+                    low[node] = index[succ]
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    if low[node] < low[parent]:
+                        low[parent] = low[node]
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+    return components
+
+
+
+def useless_symbols(productions, start_symbol):
+    """Non-terminals that derive no terminal string, and those unreachable once their rules are gone.
+
+    Returns (unproductive, unreachable) as sets. Both passes are worklists
+    over the production graph, linear in the total size of the rules: a rule
+    becomes productive when its count of unproductive non-terminal
+    occurrences drops to zero, and reachability only follows rules whose
+    symbols are all productive. Symbols without productions are terminals.
+    """
+    pending = []  # per rule: occurrences of non-terminals not yet known productive
+    lhs_of = []
+    occurrences = {symbol: [] for symbol in productions}  # non-terminal -> rule ids using it
+    productive = set()
+    work = []
+    for lhs, rules in productions.items():
+        for rule in rules:
+            rule_id = len(pending)
+            lhs_of.append(lhs)
+            count = 0
+            for sym in rule:
+                if sym in occurrences:
+                    occurrences[sym].append(rule_id)
+                    count += 1
+            pending.append(count)
+            if count == 0 and lhs not in productive:
+                productive.add(lhs)
+                work.append(lhs)
+    while work:
+        symbol = work.pop()
+        for rule_id in occurrences[symbol]:
+            pending[rule_id] -= 1
+            if pending[rule_id] == 0 and lhs_of[rule_id] not in productive:
+                productive.add(lhs_of[rule_id])
+                work.append(lhs_of[rule_id])
+    unproductive = set(productions) - productive
+
+    reachable = set()
+    if start_symbol in productive:
+        reachable.add(start_symbol)
+        work = [start_symbol]
+        while work:
+            for rule in productions[work.pop()]:
+                if any(sym in unproductive for sym in rule):
+                    continue
+                for sym in rule:
+                    if sym in productive and sym not in reachable:
+                        reachable.add(sym)
+                        work.append(sym)
+    return unproductive, productive - reachable
+
+
+class SetAnalysis:
+    """FIRST/FOLLOW engine over integer bitmasks.
+
+    Terminals (including ε and $) are interned to bit positions and
+    non-terminals to indices 0..N-1. FIRST is solved per strongly connected
+    component of the "may begin with" graph, dependencies first, with a
+    worklist inside each component that only revisits the dependents of a
+    non-terminal whose set grew. FOLLOW is a pure inclusion problem once FIRST
+    is known, so it is solved in one topological pass over the components of
+    the "FOLLOW(A) flows into FOLLOW(B)" graph.
+
+    The sets match Grammar.compute_first/compute_follow exactly.
+    """
+    def __init__(self, productions, start_symbol):
+        self.productions = productions
+        self.start_symbol = start_symbol
+        self.non_terminals = list(productions)
+        self.nt_index = {symbol: i for i, symbol in enumerate(self.non_terminals)}
+
+        self.terminals = [EPSILON, END_MARKER]
+        self.bit = {EPSILON: 0, END_MARKER: 1}
+        for rules in productions.values():
+            for rule in rules:
+                for sym in rule:
+                    if sym not in self.nt_index and sym not in self.bit:
+                        self.bit[sym] = len(self.terminals)
+                        self.terminals.append(sym)
+        self.epsilon = 1 << self.bit[EPSILON]
+
+        # Right-hand sides as (True, non-terminal index) / (False, terminal bit) pairs
+        self.rules = [
+            [[(True, self.nt_index[sym]) if sym in self.nt_index else (False, 1 << self.bit[sym]) for sym in rule]
+             for rule in productions[symbol]]
+            for symbol in self.non_terminals
+        ]
+        self.first_masks = None
+        self.follow_masks = None
+
+    def to_set(self, mask):
+        symbols = set()
+        terminals = self.terminals
+        while mask:
+            low = mask & -mask
+            symbols.add(terminals[low.bit_length() - 1])
+            mask ^= low
+        return symbols
+
+    def _first_of_rule(self, rule, first):
+        epsilon = self.epsilon
+        mask = 0
+        for is_nt, value in rule:
+            if is_nt:
+                mask |= first[value] & ~epsilon
+                if not first[value] & epsilon:
+                    return mask
+            else:
+                return mask | value
+        return mask | epsilon
+
+    def compute_first(self):
+        n = len(self.non_terminals)
+        depends = [set() for _ in range(n)]  # A -> non-terminals that can begin A
+        for a, rules in enumerate(self.rules):
+            for rule in rules:
+                for is_nt, value in rule:
+                    if not is_nt:
+                        break
+                    depends[a].add(value)
+        dependents = [[] for _ in range(n)]
+        for a in range(n):
+            for b in depends[a]:
+                dependents[b].append(a)
+
+        first = [0] * n
+        rules = self.rules
+        first_of_rule = self._first_of_rule
+        for component in strongly_connected_components(range(n), depends):
+            members = set(component)
+            worklist = list(component)
+            queued = set(component)
+            while worklist:
+                a = worklist.pop()
+                queued.discard(a)
+                mask = first[a]
+                for rule in rules[a]:
+                    mask |= first_of_rule(rule, first)
+                if mask != first[a]:
+                    first[a] = mask
+                    for d in dependents[a]:
+                        if d in members and d not in queued:
+                            queued.add(d)
+                            worklist.append(d)
+        self.first_masks = first
+        return first
+
+    def compute_follow(self):
+        if self.first_masks is None:
+            self.compute_first()
+        first = self.first_masks
+        epsilon = self.epsilon
+        n = len(self.non_terminals)
+        own = [0] * n  # terminals added to FOLLOW(B) directly
+        flows = [set() for _ in range(n)]  # A -> B when FOLLOW(A) is included in FOLLOW(B)
+        if self.start_symbol in self.nt_index:
+            own[self.nt_index[self.start_symbol]] |= 1 << self.bit[END_MARKER]
+        apostrophe = 1 << self.bit["'"] if "'" in self.bit else 0
+
+        for a, rules in enumerate(self.rules):
+            for rule in rules:
+                last = len(rule) - 1
+                for i, (is_nt, b) in enumerate(rule):
+                    if not is_nt:
+                        continue
+                    if i == last:
+                        flows[a].add(b)
+                        continue
+                    next_is_nt, value = rule[i + 1]
+                    if next_is_nt:
+                        own[b] |= first[value] & ~epsilon
+                        if first[value] & epsilon:
+                            flows[a].add(b)
+                    elif value != apostrophe:
+                        own[b] |= value
+
+        follow = [0] * n
+        # Reverse topological order: walk the component list backwards so
+        # every component sees its predecessors' final sets.
+        sources = [[] for _ in range(n)]
+        for a in range(n):
+            for b in flows[a]:
+                sources[b].append(a)
+        for component in reversed(strongly_connected_components(range(n), flows)):
+            members = set(component)
+            mask = 0
+            for b in component:
+                mask |= own[b]
+                for a in sources[b]:
+                    if a not in members:
+                        mask |= follow[a]
+            for b in component:
+                follow[b] = mask
+        self.follow_masks = follow
+        return follow
+
+    def first_sets(self):
+        if self.first_masks is None:
+            self.compute_first()
+        return {symbol: self.to_set(mask) for symbol, mask in zip(self.non_terminals, self.first_masks)}
+
+    def follow_sets(self):
+        if self.follow_masks is None:
+            self.compute_follow()
+        return {symbol: self.to_set(mask) for symbol, mask in zip(self.non_terminals, self.follow_masks)}
@@ -0,0 +1,57 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+import os
+
+# CompiledGrammar of the current worker process, installed once by _init_worker
+_compiled = None
+
+
+def _init_worker(compiled):
+    global _compiled
+    _compiled = compiled
+
+
+def _parse_chunk(chunk):
+    run = _compiled.run
+    return [run(tokens)[0] for tokens in chunk]
+
+
+def _chunks(inputs, chunksize):
+    inputs = iter(inputs)
+    while True:
+        chunk = list(islice(inputs, chunksize))
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_parse_many(grammar, inputs, workers=None, chunksize=256):
+    """Yields the parse result of every token list in `inputs`, in input order.
+
+    The grammar is compiled once and handed to each worker process when it
+    starts, so only the token chunks travel per task. At most a few chunks
+    per worker are in flight, which keeps memory bounded for long inputs.
+    """
+    compiled = grammar.compile()
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        for chunk in _chunks(inputs, chunksize):
+            for tokens in chunk:
+                yield compiled.run(tokens)[0]
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(compiled,)) as pool:
+        pending = deque()
+        for chunk in _chunks(inputs, chunksize):
+            pending.append(pool.submit(_parse_chunk, chunk))
+            if len(pending) >= workers * 4:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def parse_many(grammar, inputs, workers=None, chunksize=256):
+    """Parses many token lists against one grammar; returns the results in input order"""
+    return list(iter_parse_many(grammar, inputs, workers, chunksize))
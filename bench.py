@@ -0,0 +1,246 @@
+"""Benchmarks for grammar analysis and parsing.
+
+    python bench.py run --non-terminals 200 --tokens 100000 --output before.json
+    python bench.py compare before.json after.json
+"""
+import argparse
+import gc
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from toc import Grammar, PredictiveParser
+
+
+def generate_grammar(non_terminals=50, alternatives=3, nullable=0.3, body=3, seed=0):
+    """Random LL(1) grammar text.
+
+    N<i> has `alternatives` alternatives, each starting with a terminal of its
+    own and followed by up to `body` non-terminals of higher index and a
+    closing terminal `e`, so the grammar is acyclic and conflict free. With
+    probability `nullable` a non-terminal also gets an ε alternative; a
+    nullable non-terminal is always followed by `e`, since compute_follow
+    only looks at the symbol right after a non-terminal. The start symbol
+    S -> N0 S | ε repeats N0, so sentences can be of any length.
+    """
+    rng = random.Random(seed)
+    nullables = {i for i in range(1, non_terminals) if rng.random() < nullable}
+    productions = ["S -> N0 S | ε"]
+    for i in range(non_terminals):
+        rules = []
+        for j in range(alternatives):
+            rhs = [f"t{i}x{j}"]
+            later = range(i + 1, non_terminals)
+            if later:
+                for k in sorted(rng.sample(later, min(len(later), rng.randint(0, body)))):
+                    rhs.append(f"N{k}")
+                    if k in nullables:
+                        rhs.append("e")
+            if rhs[-1] != "e":
+                rhs.append("e")
+            rules.append(" ".join(rhs))
+        if i in nullables:
+            rules.append("ε")
+        productions.append(f"N{i} -> {' | '.join(rules)}")
+    return "; ".join(productions)
+
+
+def table_rows(grammar):
+    """Distinct productions of each predictive table row"""
+    rows = {}
+    for lhs, row in grammar.parse_table.items():
+        seen = {}
+        for production in row.values():
+            seen.setdefault(tuple(production), list(production))
+        rows[lhs] = list(seen.values())
+    return rows
+
+
+def shortest_yields(rows):
+    """Length of the shortest terminal string each non-terminal derives"""
+    shortest = {lhs: float("inf") for lhs in rows}
+
+    def length(sym):
+        if sym == 'ε':
+            return 0
+        return shortest[sym] if sym in shortest else 1
+
+    changed = True
+    while changed:
+        changed = False
+        for lhs, productions in rows.items():
+            for production in productions:
+                total = sum(length(sym) for sym in production)
+                if total < shortest[lhs]:
+                    shortest[lhs] = total
+                    changed = True
+    return shortest
+
+
+def generate_sentences(grammar, target_tokens, sentence_tokens=1000, seed=0):
+    """Yields random sentences of the grammar until target_tokens tokens were produced.
+
+    Expansions are drawn from the predictive table rows. Until a sentence
+    reaches sentence_tokens only productions longer than the shortest one
+    are drawn (so S -> N0 S | ε keeps repeating N0); after that the
+    generator switches to the shortest productions so it terminates.
+    """
+    rng = random.Random(seed)
+    rows = table_rows(grammar)
+    shortest = shortest_yields(rows)
+
+    def cost(sym):
+        if sym == 'ε':
+            return 0
+        return shortest[sym] if sym in shortest else 1
+
+    def production_cost(production):
+        return sum(cost(sym) for sym in production)
+
+    cheapest = {lhs: min(productions, key=production_cost) for lhs, productions in rows.items() if productions}
+    growing = {lhs: [p for p in productions if production_cost(p) > production_cost(cheapest[lhs])] or productions
+               for lhs, productions in rows.items() if productions}
+
+    produced = 0
+    while produced < target_tokens:
+        budget = min(sentence_tokens, target_tokens - produced)
+        sentence = []
+        stack = [grammar.start_symbol]
+        pending = cost(grammar.start_symbol)
+        while stack:
+            sym = stack.pop()
+            pending -= cost(sym)
+            if sym == 'ε':
+                continue
+            if sym not in rows:
+                sentence.append(sym)
+                continue
+            if len(sentence) + pending >= budget:
+                production = cheapest[sym]
+            else:
+                production = rng.choice(growing[sym])
+            for child in reversed(production):
+                stack.append(child)
+                pending += cost(child)
+        yield sentence
+        produced += max(len(sentence), 1)
+
+
+def measure(fn, track_memory):
+    gc.collect()
+    if track_memory:
+        tracemalloc.start()
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return peak
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def run_phases(text, corpus, track_memory=False):
+    """Runs every analysis and parse phase once; returns {phase: seconds or peak bytes}"""
+    results = {}
+    grammar = Grammar(text, skip_validation=True)
+
+    def phase(name, fn):
+        results[name] = measure(fn, track_memory)
+
+    phase("parse_productions", lambda: grammar.parse_productions(text))
+    phase("remove_left_recursion", grammar.remove_left_recursion)
+    phase("compute_first", grammar.compute_first)
+    phase("compute_follow", grammar.compute_follow)
+    phase("compute_sets", grammar.compute_sets)
+    phase("construct_predictive_table", grammar.construct_predictive_table)
+    phase("compile", grammar.compile)
+
+    parser = PredictiveParser(grammar)
+    phase("parse", lambda: [parser.parse(list(sentence)) for sentence in corpus])
+    phase("parse_compiled", lambda: [parser.parse_compiled(sentence) for sentence in corpus])
+    phase("parse_stream", lambda: [parser.parse_stream(iter(sentence)) for sentence in corpus])
+    return results
+
+
+def run(args):
+    text = generate_grammar(args.non_terminals, args.alternatives, args.nullable, args.body, args.seed)
+    reference = Grammar(text)
+    reference.compute_sets()
+    reference.construct_predictive_table()
+    corpus = list(generate_sentences(reference, args.tokens, args.sentence_tokens, args.seed))
+    lengths = [len(sentence) for sentence in corpus]
+    if sum(lengths) < args.tokens or min(lengths[:-1], default=args.sentence_tokens) < args.sentence_tokens:
+        raise SystemExit(f"Corpus too small: {sum(lengths)} tokens in sentences of "
+                         f"{min(lengths, default=0)}..{max(lengths, default=0)} tokens")
+
+    seconds = {}
+    for _ in range(args.repeat):
+        for name, value in run_phases(text, corpus).items():
+            seconds[name] = min(value, seconds.get(name, value))
+    peak_bytes = run_phases(text, corpus, track_memory=True) if args.memory else {}
+
+    report = {
+        "config": {key: value for key, value in vars(args).items() if key not in ("command", "output", "func")},
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "grammar": {
+            "non_terminals": len(reference.non_terminals),
+            "terminals": len(reference.terminals),
+            "productions": sum(len(rules) for rules in reference.productions.values()),
+        },
+        "corpus": {"sentences": len(corpus), "tokens": sum(len(sentence) for sentence in corpus)},
+        "phases": {name: {"seconds": seconds[name], "peak_bytes": peak_bytes.get(name)} for name in seconds},
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    for name, values in report["phases"].items():
+        peak = "" if values["peak_bytes"] is None else f"{values['peak_bytes'] / 1024:12.1f} KiB"
+        print(f"{name:28}{values['seconds']:12.6f} s{peak}")
+    print(f"Results written to {args.output}")
+
+
+def compare(args):
+    with open(args.before) as f:
+        before = json.load(f)["phases"]
+    with open(args.after) as f:
+        after = json.load(f)["phases"]
+    print(f"{'phase':28}{'before':>12}{'after':>12}{'ratio':>9}")
+    for name in before:
+        if name not in after:
+            continue
+        old, new = before[name]["seconds"], after[name]["seconds"]
+        ratio = new / old if old else float("inf")
+        print(f"{name:28}{old:12.6f}{new:12.6f}{ratio:9.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="generate a grammar and corpus and time every phase")
+    run_parser.add_argument("--non-terminals", type=int, default=50)
+    run_parser.add_argument("--alternatives", type=int, default=3)
+    run_parser.add_argument("--nullable", type=float, default=0.3)
+    run_parser.add_argument("--body", type=int, default=3, help="max non-terminals per alternative")
+    run_parser.add_argument("--tokens", type=int, default=20000, help="corpus size in tokens")
+    run_parser.add_argument("--sentence-tokens", type=int, default=1000, help="target tokens per sentence")
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--repeat", type=int, default=3, help="timing runs; the minimum is reported")
+    run_parser.add_argument("--no-memory", dest="memory", action="store_false", help="skip the tracemalloc pass")
+    run_parser.add_argument("--output", default="bench_results.json")
+    run_parser.set_defaults(func=run)
+
+    compare_parser = commands.add_parser("compare", help="compare the timings of two result files")
+    compare_parser.add_argument("before")
+    compare_parser.add_argument("after")
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
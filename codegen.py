@@ -0,0 +1,184 @@
+"""Generates standalone parser modules from an analyzed Grammar.
+
+    from codegen import write_module
+    write_module(grammar, "expr_parser.py", style="table")   # or "descent"
+
+    import expr_parser
+    expr_parser.parse(["i", "+", "i"])  # -> "Input parsed successfully."
+
+The generated module has no dependency on toc.py and does no analysis at
+import time: the table (or the recursive-descent functions) are literals.
+parse() returns the same result strings as PredictiveParser.parse().
+"""
+from collections import defaultdict
+
+HEADER = '''"""LL(1) parser generated by codegen.py from the grammar in GRAMMAR."""
+
+GRAMMAR = (
+{grammar}
+)
+SYMBOLS = {symbols!r}
+TERMINAL_IDS = {terminal_ids!r}
+N_TERMINALS = {n_terminals!r}
+WIDTH = {width!r}
+END = {end!r}
+START = {start!r}
+'''
+
+TABLE_DRIVER = '''
+# Row-displacement packed LL(1) table: cell (non_terminal, terminal) holds
+# VALUE[BASE[non_terminal] + terminal] when CHECK at that index is non_terminal, else nil
+BASE = {base!r}
+CHECK = {check!r}
+VALUE = {value!r}
+# Productions as pre-reversed symbol id tuples (ε dropped)
+PRODUCTIONS = {productions!r}
+
+
+def parse(tokens):
+    terminal_ids = TERMINAL_IDS
+    base = BASE
+    check = CHECK
+    value = VALUE
+    productions = PRODUCTIONS
+    n = len(tokens)
+    position = 0
+    current = terminal_ids.get(tokens[0], -1) if n else END
+    stack = [START]
+    pop = stack.pop
+    extend = stack.extend
+
+    while stack:
+        top = pop()
+        if top >= N_TERMINALS:
+            if not 0 <= current < WIDTH:
+                token = tokens[position] if position < n else '$'
+                return f"\\nError: No rule for {{SYMBOLS[top]}} with input '{{token}}'"
+            index = base[top] + current
+            rule = value[index] if check[index] == top else -1
+            if rule < 0:
+                token = tokens[position] if position < n else '$'
+                return f"\\nError: No production for {{SYMBOLS[top]}} with input '{{token}}'"
+            extend(productions[rule])
+        elif top == current:
+            if top == END:
+                return "Input parsed successfully."
+            position += 1
+            current = terminal_ids.get(tokens[position], -1) if position < n else END
+        else:
+            token = tokens[position] if position < n else '$'
+            return f"\\nError: Expected '{{SYMBOLS[top]}}', found '{{token}}'"
+
+    return "Input not fully consumed." if current != END else "Input parsed successfully."
+'''
+
+DESCENT_DRIVER = '''
+
+class _Stop(Exception):
+    pass
+
+
+class _Parser:
+    __slots__ = ("tokens", "n", "position", "current")
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.n = len(tokens)
+        self.position = 0
+        self.current = TERMINAL_IDS.get(tokens[0], -1) if self.n else END
+
+    def token(self):
+        return self.tokens[self.position] if self.position < self.n else '$'
+
+    def match(self, terminal):
+        if self.current != terminal:
+            raise _Stop(f"\\nError: Expected '{SYMBOLS[terminal]}', found '{self.token()}'")
+        if terminal == END:
+            raise _Stop("Input parsed successfully.")
+        self.position += 1
+        self.current = TERMINAL_IDS.get(self.tokens[self.position], -1) if self.position < self.n else END
+
+    def fail(self, non_terminal):
+        kind = "No rule" if not 0 <= self.current < WIDTH else "No production"
+        raise _Stop(f"\\nError: {kind} for {SYMBOLS[non_terminal]} with input '{self.token()}'")
+
+
+def parse(tokens):
+    """Recursion depth grows with nesting, except for right recursion into the same non-terminal"""
+    parser = _Parser(tokens)
+    try:
+        {start_function}(parser)
+    except _Stop as stop:
+        return stop.args[0]
+    return "Input not fully consumed." if parser.current != END else "Input parsed successfully."
+'''
+
+
+def comment(text):
+    """`text` made safe for a # comment (no line breaks or NUL bytes)"""
+    return repr(text)[1:-1]
+
+
+def function_name(compiled, symbol):
+    return f"_nt_{symbol - compiled.n_terminals}"
+
+
+def descent_functions(compiled):
+    lines = []
+    for row_index, name in enumerate(compiled.symbols[compiled.n_terminals:]):
+        symbol = compiled.n_terminals + row_index
+        selectors = defaultdict(list)  # production -> terminals selecting it
+        for terminal in range(compiled.width):
+            rule = compiled.lookup(symbol, terminal)
+            if rule >= 0:
+                selectors[rule].append(terminal)
+
+        lines.append("")
+        lines.append("")
+        lines.append(f"def {function_name(compiled, symbol)}(p):  # {comment(name)}")
+        lines.append("    while True:")
+        lines.append("        current = p.current")
+        for rule, terminals in selectors.items():
+            body = list(reversed(compiled.productions[rule]))
+            condition = f"current == {terminals[0]}" if len(terminals) == 1 else f"current in {set(terminals)!r}"
+            lines.append(f"        if {condition}:  # {comment(' '.join(compiled.rules[rule]))}")
+            tail_call = bool(body) and body[-1] == symbol
+            if tail_call:
+                body = body[:-1]
+            for sym in body:
+                if sym >= compiled.n_terminals:
+                    lines.append(f"            {function_name(compiled, sym)}(p)")
+                else:
+                    lines.append(f"            p.match({sym})")
+            lines.append("            continue" if tail_call else "            return")
+        lines.append(f"        p.fail({symbol})")
+    return "\n".join(lines) + "\n"
+
+
+def generate_module(grammar, style="table"):
+    """Returns the source of a standalone parser module for `grammar` (style 'table' or 'descent')"""
+    if style not in ("table", "descent"):
+        raise ValueError(f"Unknown parser style '{style}'")
+    compiled = grammar.compile()
+    # The grammar is emitted as repr()'d strings: any symbol text stays valid source
+    text = "\n".join(f"    {lhs + ' -> ' + ' | '.join(' '.join(rule) for rule in rules)!r},"
+                     for lhs, rules in grammar.productions.items())
+    source = HEADER.format(
+        grammar=text,
+        symbols=tuple(compiled.symbols),
+        terminal_ids=compiled.terminal_ids,
+        n_terminals=compiled.n_terminals,
+        width=compiled.width,
+        end=compiled.end,
+        start=compiled.start,
+    )
+    if style == "table":
+        return source + TABLE_DRIVER.format(base=tuple(compiled.base), check=tuple(compiled.check),
+                                            value=tuple(compiled.value), productions=tuple(compiled.productions))
+    return (source + descent_functions(compiled) +
+            DESCENT_DRIVER.replace("{start_function}", function_name(compiled, compiled.start)))
+
+
+def write_module(grammar, path, style="table"):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(generate_module(grammar, style))
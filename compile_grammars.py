@@ -0,0 +1,195 @@
+"""Bulk grammar compilation for CI.
+
+    python compile_grammars.py grammars/ --output build/ --workers 8
+    python compile_grammars.py manifest.txt --output build/ --remove-useless
+
+The input is a directory (every file matching --pattern, recursively) or a
+manifest listing one grammar path per line, relative to the manifest; `#`
+starts a comment. Outputs keep the grammar's relative directory; a path
+that would be written outside --output, or a second grammar with the same
+output name, is reported as a failure. Each grammar is read with the streaming loader, checked
+(check_syntax, check_undefined_symbols), transformed, and its predictive
+table built and checked for LL(1) conflicts, on a process pool. The pickled
+CompiledGrammar goes to <output>/<name>.pickle (plus <name>.py with
+--modules) and every result, with per-phase timings and conflicts, to
+<output>/summary.json. The exit status is 1 when any grammar failed to
+load or has conflicts; check_syntax and check_undefined_symbols messages
+are warnings (as they are for Grammar()) unless --strict is given.
+"""
+import argparse
+import json
+import os
+import pickle
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import codegen
+from loader import GrammarSyntaxError, read_file
+from profiling import ParseStats
+from toc import Grammar
+
+
+def find_grammars(source, pattern="*.grammar"):
+    """(name, path) for every grammar in a directory or manifest; names are paths without the suffix"""
+    source = Path(source)
+    if source.is_dir():
+        return [(path.relative_to(source).with_suffix("").as_posix(), path)
+                for path in sorted(source.rglob(pattern)) if path.is_file()]
+    grammars = []
+    with open(source, encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if line:
+                path = source.parent / line
+                grammars.append((Path(os.path.normpath(line)).with_suffix("").as_posix(), path))
+    return grammars
+
+
+def output_path(output, name):
+    """<output>/<name>, refusing names that resolve outside `output`"""
+    root = Path(output).resolve()
+    target = (root / name).resolve()
+    if root not in target.parents:
+        raise ValueError(f"Output for '{name}' would be written outside {output}")
+    return target
+
+
+def failed_entry(name, path, message):
+    return {"name": name, "path": str(path), "status": "error", "errors": [message], "warnings": [],
+            "conflicts": [], "seconds": 0.0, "phases": {}}
+
+
+def compile_grammar(name, path, output, transform=True, remove_useless=False, modules=False, strict=False):
+    """Checks and compiles one grammar file; returns its summary entry"""
+    stats = ParseStats()
+    entry = {"name": name, "path": str(path), "status": "ok", "errors": [], "warnings": [], "conflicts": []}
+    started = time.perf_counter()
+    try:
+        target = output_path(output, name)
+        with stats.phase("read"):
+            productions = read_file(path)
+        grammar = Grammar(productions, skip_validation=True, stats=stats)
+        with stats.phase("validate_grammar"):
+            for result in (grammar.check_syntax(), grammar.check_undefined_symbols()):
+                entry["errors" if strict else "warnings"].extend(result.errors)
+
+        if transform:
+            grammar.remove_left_recursion()
+            grammar.remove_common_prefixes()
+        if remove_useless:
+            report = grammar.remove_useless_symbols()
+            entry["useless"] = {"unproductive": sorted(report.unproductive),
+                                "unreachable": sorted(report.unreachable),
+                                "removed_rules": len(report.removed_rules)}
+
+        ll1 = grammar.check_ll1_conditions()
+        entry["conflicts"] = [
+            {"lhs": c.lhs, "terminal": c.terminal, "kind": c.kind,
+             "productions": [" ".join(production) for production in c.productions]}
+            for c in ll1.conflicts
+        ]
+        compiled = grammar.compile()
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with stats.phase("write"):
+            with open(target.with_suffix(".pickle"), "wb") as f:
+                pickle.dump(compiled, f, protocol=pickle.HIGHEST_PROTOCOL)
+            entry["compiled"] = str(target.with_suffix(".pickle"))
+            if modules and not entry["conflicts"]:
+                codegen.write_module(grammar, target.with_suffix(".py"))
+                entry["module"] = str(target.with_suffix(".py"))
+
+        entry.update(non_terminals=len(grammar.non_terminals), terminals=len(grammar.terminals),
+                     productions=sum(len(rules) for rules in grammar.productions.values()),
+                     table_cells=sum(len(row) for row in grammar.parse_table.values()))
+        if entry["errors"] or entry["conflicts"]:
+            entry["status"] = "invalid"
+    except (GrammarSyntaxError, ValueError, OSError) as e:
+        entry["status"] = "error"
+        entry["errors"].append(str(e))
+    except Exception as e:  # a bug on one grammar must not abort the whole run
+        entry["status"] = "error"
+        entry["errors"].append(f"{type(e).__name__}: {e}")
+    entry["seconds"] = time.perf_counter() - started
+    entry["phases"] = {phase: seconds for phase, (_, seconds) in stats.phases.items()}
+    return entry
+
+
+def compile_all(grammars, output, workers=None, **options):
+    """Yields (index, summary entry) as grammars finish; workers=1 compiles in this process"""
+    workers = workers or os.cpu_count() or 1
+    jobs = []
+    seen = {}
+    for index, (name, path) in enumerate(grammars):
+        key = os.path.normcase(name)
+        if key in seen:
+            yield index, failed_entry(name, path, f"Output name '{name}' is also used by {grammars[seen[key]][1]}")
+        else:
+            seen[key] = index
+            jobs.append((index, name, path))
+    if workers == 1:
+        for index, name, path in jobs:
+            yield index, compile_grammar(name, path, output, **options)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(compile_grammar, name, path, output, **options): (index, name, path)
+                   for index, name, path in jobs}
+        for future in as_completed(futures):
+            index, name, path = futures[future]
+            try:
+                yield index, future.result()
+            except Exception as e:  # the worker process died
+                yield index, failed_entry(name, path, f"{type(e).__name__}: {e}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", help="directory of grammar files or a manifest listing them")
+    parser.add_argument("--output", default="build", help="directory for compiled tables and summary.json")
+    parser.add_argument("--pattern", default="*.grammar", help="file pattern when SOURCE is a directory")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: CPU count)")
+    parser.add_argument("--no-transform", dest="transform", action="store_false",
+                        help="skip left recursion and common prefix removal")
+    parser.add_argument("--remove-useless", action="store_true", help="also drop unproductive and unreachable symbols")
+    parser.add_argument("--modules", action="store_true", help="also write a standalone parser module per LL(1) grammar")
+    parser.add_argument("--strict", action="store_true", help="treat syntax and undefined-symbol messages as errors")
+    parser.add_argument("--summary", help="summary path (default: OUTPUT/summary.json)")
+    args = parser.parse_args(argv)
+
+    grammars = find_grammars(args.source, args.pattern)
+    if not grammars:
+        print(f"No grammars found in {args.source}", file=sys.stderr)
+        return 1
+    os.makedirs(args.output, exist_ok=True)
+
+    started = time.perf_counter()
+    entries = [None] * len(grammars)
+    for index, entry in compile_all(grammars, args.output, args.workers, transform=args.transform,
+                             remove_useless=args.remove_useless, modules=args.modules, strict=args.strict):
+        detail = f"{len(entry['conflicts'])} conflicts, {len(entry['errors'])} errors"
+        if entry["status"] == "error":
+            detail = entry["errors"][-1]
+        elif entry["status"] == "ok":
+            detail = f"{len(entry['warnings'])} warnings" if entry["warnings"] else ""
+        print(f"{entry['status']:8}{entry['seconds']:10.3f} s  {entry['name']}  {detail}".rstrip())
+        entries[index] = entry
+
+    failed = sum(entry["status"] != "ok" for entry in entries)
+    summary = {
+        "grammars": entries,
+        "total": len(entries),
+        "failed": failed,
+        "workers": args.workers or os.cpu_count() or 1,
+        "seconds": time.perf_counter() - started,
+    }
+    summary_path = args.summary or os.path.join(args.output, "summary.json")
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+    print(f"{len(entries) - failed}/{len(entries)} grammars compiled; summary written to {summary_path}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
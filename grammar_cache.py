@@ -0,0 +1,128 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+
+from toc import Grammar
+
+CACHE_FORMAT = 3  # bump when the pickled Grammar layout changes
+DEFAULT_DIRECTORY = os.environ.get(
+    "PREDICTIVE_PARSER_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "predictive_parser")
+)
+
+
+def normalize_grammar(text):
+    """Canonical form of a grammar string: whitespace and empty alternatives do not change the key"""
+    productions = []
+    for production in text.split(";"):
+        if "->" not in production:
+            continue
+        lhs, rhs = production.split("->", 1)
+        alternatives = [" ".join(alt.split()) for alt in rhs.split("|")]
+        productions.append(f"{lhs.strip()} -> {' | '.join(alt for alt in alternatives if alt)}")
+    return ";".join(productions)
+
+
+def grammar_source(text):
+    """Key material for a grammar string, or for {lhs: [rule, ...]} productions as loader.read_file returns"""
+    if isinstance(text, str):
+        return "text\0" + normalize_grammar(text)
+    return "productions\0" + json.dumps([[lhs, rules] for lhs, rules in text.items()], ensure_ascii=False)
+
+
+def analyze(text):
+    """Default build step: validated grammar with FIRST/FOLLOW sets, predictive table and compiled table"""
+    grammar = Grammar(text)
+    grammar.compile()  # each analysis stage is computed once, on the way
+    return grammar
+
+
+class GrammarCache:
+    """Persistent cache of analyzed Grammar objects.
+
+    Entries are pickled Grammars (productions, FIRST/FOLLOW, predictive table
+    and compiled table) stored under the hash of the normalized grammar
+    text, or of the productions when a mapping is given. A load touches the
+    file's mtime, and store() evicts the least recently used entries once
+    the directory exceeds max_bytes or max_entries.
+    """
+    SUFFIX = ".grammar"
+
+    def __init__(self, directory=DEFAULT_DIRECTORY, max_bytes=64 * 1024 * 1024, max_entries=None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, text, variant=""):
+        data = f"{CACHE_FORMAT}\0{pickle.HIGHEST_PROTOCOL}\0{variant}\0{grammar_source(text)}"
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + self.SUFFIX)
+
+    def load(self, text, variant=""):
+        path = self.path(self.key(text, variant))
+        try:
+            with open(path, "rb") as f:
+                grammar = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:  # Stale or truncated entry; unpickling can fail in many ways
+            self.remove(path)
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:  # Evicted by another process meanwhile
+            pass
+        return grammar
+
+    def store(self, text, grammar, variant=""):
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(grammar, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self.path(self.key(text, variant)))
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        self.evict()
+
+    def get(self, text, build=analyze, variant=""):
+        """Returns the cached grammar for `text`, building and storing it on a miss"""
+        grammar = self.load(text, variant)
+        if grammar is None:
+            grammar = build(text)
+            self.store(text, grammar, variant)
+        return grammar
+
+    def entries(self):
+        """(mtime, size, path) of every entry, least recently used first"""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(self.SUFFIX):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        entries.sort()
+        return entries
+
+    def evict(self):
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        while entries and (total > self.max_bytes or
+                           (self.max_entries is not None and len(entries) > self.max_entries)):
+            _, size, path = entries.pop(0)
+            self.remove(path)
+            total -= size
+
+    @staticmethod
+    def remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        for _, _, path in self.entries():
+            self.remove(path)
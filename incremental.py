@@ -0,0 +1,255 @@
+from collections import Counter, defaultdict, namedtuple
+
+# What an edit touched: FIRST/FOLLOW sets that changed, table rows rebuilt,
+# and LL(1) conflicts that appeared or disappeared
+EditReport = namedtuple("EditReport", "first_changed follow_changed rows_rebuilt conflicts_added conflicts_removed")
+
+
+def _count(counter, key, delta):
+    counter[key] += delta
+    if counter[key] <= 0:
+        del counter[key]
+
+
+class GrammarEditor:
+    """Adds, removes and replaces productions of a live Grammar.
+
+    The editor keeps reverse indexes of the productions so an edit only
+    recomputes the FIRST sets that can read the edited non-terminal, the
+    FOLLOW sets reachable from the changed occurrences, and the predictive
+    table rows depending on either. The results are the same as rebuilding
+    the grammar with compute_sets() and construct_predictive_table().
+    The sets, table, terminal set and conflicts are updated in place, so
+    the grammar's memoized stages stay valid; only per-production FIRST,
+    the dense display table and the compiled table are dropped.
+    """
+    def __init__(self, grammar):
+        self.grammar = grammar
+        grammar.parse_table  # computes any missing analysis stage
+        self.prefix_users = defaultdict(Counter)  # sym -> non-terminals whose FIRST reads sym
+        self.occurrences = defaultdict(Counter)  # sym -> non-terminals with sym on a right-hand side
+        self.preceders = defaultdict(Counter)  # sym -> symbols directly before it
+        self.tails = defaultdict(Counter)  # A -> B where FOLLOW(A) may flow into FOLLOW(B)
+        for lhs, rules in grammar.productions.items():
+            for rule in rules:
+                self._index(lhs, rule, 1)
+        self.conflicts = {lhs: set() for lhs in grammar.productions}
+        for conflict in grammar.conflicts:
+            self.conflicts[conflict.lhs].add(conflict)
+
+    def _index(self, lhs, rule, delta):
+        productions = self.grammar.productions
+        last = len(rule) - 1
+        for i, sym in enumerate(rule):
+            _count(self.occurrences[sym], lhs, delta)
+            if i < last:
+                _count(self.preceders[rule[i + 1]], sym, delta)
+            if sym in productions and (i == last or rule[i + 1] in productions):
+                _count(self.tails[lhs], sym, delta)
+        for sym in rule:
+            _count(self.prefix_users[sym], lhs, delta)
+            if sym not in productions:
+                break
+
+    def add(self, lhs, rule):
+        return self.edit(lhs, add=[rule])
+
+    def remove(self, lhs, rule):
+        return self.edit(lhs, remove=[rule])
+
+    def replace(self, lhs, old, new):
+        return self.edit(lhs, remove=[old], add=[new])
+
+    def edit(self, lhs, remove=(), add=()):
+        grammar = self.grammar
+        productions = grammar.productions
+        old_rules = productions.get(lhs, [])
+        new_rules = list(old_rules)
+        for rule in remove:
+            if list(rule) not in new_rules:
+                raise ValueError(f"No production {lhs} -> {' '.join(rule)}")
+            new_rules.remove(list(rule))
+        new_rules.extend(list(rule) for rule in add)
+        if not new_rules and lhs == grammar.start_symbol:
+            raise ValueError(f"Cannot remove the last production of the start symbol {lhs}")
+
+        created = lhs not in productions and bool(new_rules)
+        deleted = lhs in productions and not new_rules
+        for rule in old_rules:
+            self._index(lhs, rule, -1)
+        # Right-hand sides mentioning lhs are indexed by whether it is a non-terminal
+        neighbours = [user for user in self.occurrences[lhs] if user != lhs] if created or deleted else []
+        for user in neighbours:
+            for rule in productions[user]:
+                self._index(user, rule, -1)
+        if new_rules:
+            productions[lhs] = new_rules
+        else:
+            del productions[lhs]
+        for user in neighbours:
+            for rule in productions[user]:
+                self._index(user, rule, 1)
+        for rule in new_rules:
+            self._index(lhs, rule, 1)
+
+        self._update_symbols(lhs, old_rules, new_rules, created, deleted)
+        first_region, first_changed = self._update_first(lhs, deleted)
+        grammar.production_first.clear()
+        follow_changed = self._update_follow(lhs, old_rules, new_rules, first_changed, created or deleted)
+
+        rows = (first_region | follow_changed) & set(productions)
+        if not deleted:
+            rows.add(lhs)
+        added, removed = set(), set()
+        if deleted:
+            removed |= self.conflicts.pop(lhs, set())
+        for row in rows:
+            before = self.conflicts.get(row, set())
+            after = set()
+            grammar.parse_table[row] = grammar.construct_table_row(row, conflicts=after)
+            added |= after - before
+            removed |= before - after
+            self.conflicts[row] = after
+        grammar.invalidate("predictive_table")  # the dense display view
+        grammar.compiled = None
+        grammar._stages["conflicts"] = set().union(*self.conflicts.values())
+        if deleted:
+            first_changed.add(lhs)
+            follow_changed.add(lhs)
+        return EditReport(first_changed, follow_changed, rows, added, removed)
+
+    def _update_symbols(self, lhs, old_rules, new_rules, created, deleted):
+        grammar = self.grammar
+        table = grammar.parse_table
+        new_terminals = set()
+        if created:
+            grammar.non_terminals.add(lhs)
+            if lhs in grammar.terminals:
+                grammar.terminals.discard(lhs)
+                for row in table.values():
+                    row.pop(lhs, None)
+        if deleted:
+            grammar.non_terminals.discard(lhs)
+            table.pop(lhs, None)
+            grammar.first.pop(lhs, None)
+            grammar.follow.pop(lhs, None)
+            if self.occurrences[lhs]:
+                new_terminals.add(lhs)
+        for rule in new_rules:
+            for sym in rule:
+                if sym not in grammar.productions and sym != "'" and sym not in grammar.terminals:
+                    new_terminals.add(sym)
+        grammar.terminals |= new_terminals  # sparse rows need no new empty cells
+        # Terminals only the removed rules used leave the set (as with determine_terminals)
+        for rule in old_rules:
+            for sym in rule:
+                if sym != '$' and sym not in grammar.productions and not self.occurrences[sym]:
+                    grammar.terminals.discard(sym)
+
+    def _first_of(self, lhs):
+        """FIRST(lhs) from its productions and the current sets (compute_first semantics)"""
+        productions = self.grammar.productions
+        first = self.grammar.first
+        result = set()
+        for production in productions[lhs]:
+            for sym in production:
+                if sym in productions:
+                    result |= first[sym] - {'ε'}
+                    if 'ε' not in first[sym]:
+                        break
+                else:
+                    result.add(sym)
+                    break
+            else:
+                result.add('ε')
+        return result
+
+    def _update_first(self, lhs, deleted):
+        productions = self.grammar.productions
+        first = self.grammar.first
+        region = set()
+        stack = [lhs]
+        while stack:
+            sym = stack.pop()
+            for user in self.prefix_users[sym]:
+                if user not in region:
+                    region.add(user)
+                    stack.append(user)
+        if not deleted:
+            region.add(lhs)
+        region &= set(productions)
+
+        old = {symbol: first.get(symbol) for symbol in region}
+        for symbol in region:
+            first[symbol] = set()
+        work = list(region)
+        queued = set(region)
+        while work:
+            symbol = work.pop()
+            queued.discard(symbol)
+            new = self._first_of(symbol)
+            if new != first[symbol]:
+                first[symbol] = new
+                for user in self.prefix_users[symbol]:
+                    if user in region and user not in queued:
+                        queued.add(user)
+                        work.append(user)
+        return region, {symbol for symbol in region if first[symbol] != old[symbol]}
+
+    def _update_follow(self, lhs, old_rules, new_rules, first_changed, symbol_changed):
+        grammar = self.grammar
+        productions = grammar.productions
+        first = grammar.first
+        follow = grammar.follow
+
+        seeds = {sym for rule in old_rules + new_rules for sym in rule}
+        for sym in first_changed | ({lhs} if symbol_changed else set()):
+            seeds.update(self.preceders[sym])
+        if symbol_changed:
+            seeds.add(lhs)
+        region = {sym for sym in seeds if sym in productions}
+        stack = list(region)
+        while stack:
+            source = stack.pop()
+            for target in self.tails[source]:
+                if target not in region:
+                    region.add(target)
+                    stack.append(target)
+
+        old = {symbol: follow.get(symbol) for symbol in region}
+        inflows = defaultdict(set)  # source in region -> targets in region
+        for symbol in region:
+            own = {'$'} if symbol == grammar.start_symbol else set()
+            for user in self.occurrences[symbol]:
+                for rule in productions[user]:
+                    last = len(rule) - 1
+                    for i, sym in enumerate(rule):
+                        if sym != symbol:
+                            continue
+                        flows = i == last
+                        if not flows:
+                            next_sym = rule[i + 1]
+                            if next_sym in productions:
+                                own |= first[next_sym] - {'ε'}
+                                flows = 'ε' in first[next_sym]
+                            elif next_sym != "'":
+                                own.add(next_sym)
+                        if flows:
+                            if user in region:
+                                inflows[user].add(symbol)
+                            else:
+                                own |= follow[user]
+            follow[symbol] = own
+
+        work = list(region)
+        queued = set(region)
+        while work:
+            source = work.pop()
+            queued.discard(source)
+            for target in inflows[source]:
+                if not follow[source] <= follow[target]:
+                    follow[target] |= follow[source]
+                    if target not in queued:
+                        queued.add(target)
+                        work.append(target)
+        return {symbol for symbol in region if follow[symbol] != old[symbol]}
@@ -0,0 +1,113 @@
+import mmap
+import re
+
+SKIP_WHITESPACE = r"\s+"
+
+
+class LexError(ValueError):
+    def __init__(self, text, offset):
+        self.offset = offset
+        self.line, self.column = line_and_column(text, offset)
+        char = text[offset:offset + 1]
+        if isinstance(char, (bytes, bytearray)):
+            char = char.decode("utf-8", "replace")
+        super().__init__(f"Unexpected character {char!r} at line {self.line}, column {self.column} (offset {offset})")
+
+
+def line_and_column(text, offset):
+    """1-based line and column of a character offset in a str or bytes-like buffer"""
+    newline = "\n" if isinstance(text, str) else b"\n"
+    line = 1
+    line_start = 0
+    while True:  # find() rather than count(): mmap has no count()
+        index = text.find(newline, line_start, offset)
+        if index < 0:
+            return line, offset - line_start + 1
+        line += 1
+        line_start = index + 1
+
+
+class Lexer:
+    """Scanner generated from a grammar's terminals.
+
+    Literal terminals are compiled into one alternation, longest first, and
+    each optional token class ({terminal: regex}, e.g. {'id': r'[a-z]\\w*'})
+    into its own matcher. At each position the longest match wins; on a tie
+    a literal beats a class, so keywords are reserved, and an earlier class
+    beats a later one. Empty matches never count. Tokens are produced
+    lazily as terminal names, ready for PredictiveParser.parse_stream, or as
+    (terminal, start, end) offsets; str, bytes and memory-mapped files are
+    scanned in place.
+    """
+    def __init__(self, terminals, token_classes=None, skip=SKIP_WHITESPACE):
+        token_classes = dict(token_classes or {})
+        literals = sorted((t for t in terminals if t not in ('ε', '$') and t not in token_classes),
+                          key=lambda t: (-len(t), t))
+        if literals and not literals[-1]:
+            raise ValueError("Empty terminal: it would match at every position")
+        self.literals = literals
+        self.token_classes = token_classes
+        self.skip = skip
+        # Group names _0, _1, ... map back to terminal names
+        self.literal_names = {f"_{i}": t for i, t in enumerate(literals)}
+        self._compiled = {}
+
+    @classmethod
+    def from_grammar(cls, grammar, token_classes=None, skip=SKIP_WHITESPACE):
+        return cls(grammar.terminals, token_classes, skip)
+
+    def _patterns(self, text):
+        kind = str if isinstance(text, str) else bytes
+        if kind not in self._compiled:
+            def compile(source):
+                if not source:
+                    return None
+                return re.compile(source if kind is str else source.encode("utf-8")).match
+
+            literal = "|".join(f"(?P<{name}>{re.escape(t)})" for name, t in self.literal_names.items())
+            classes = [(t, compile(pattern)) for t, pattern in self.token_classes.items() if pattern]
+            self._compiled[kind] = compile(literal), classes, compile(self.skip)
+        return self._compiled[kind]
+
+    def scan(self, text, pos=0):
+        """Yields (terminal, start, end) for every token of a str or bytes-like buffer"""
+        literal_match, class_matches, skip_match = self._patterns(text)
+        literal_names = self.literal_names
+        n = len(text)
+        while True:
+            if skip_match:
+                m = skip_match(text, pos)
+                if m:
+                    pos = m.end()
+            if pos >= n:
+                return
+            literal = literal_match(text, pos) if literal_match else None
+            if literal:
+                terminal, end = literal_names[literal.lastgroup], literal.end()
+            else:
+                terminal, end = None, pos
+            for name, match in class_matches:
+                m = match(text, pos)
+                if m and m.end() > end:
+                    terminal, end = name, m.end()
+            if terminal is None:
+                raise LexError(text, pos)
+            yield terminal, pos, end
+            pos = end
+
+    def tokens(self, text):
+        """Yields the terminal name of every token"""
+        for terminal, _, _ in self.scan(text):
+            yield terminal
+
+    def scan_file(self, path):
+        """scan() over a memory-mapped file; offsets are byte offsets"""
+        with open(path, "rb") as f:
+            if f.seek(0, 2) == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                yield from self.scan(buffer)
+
+    def tokens_file(self, path):
+        for terminal, _, _ in self.scan_file(path):
+            yield terminal
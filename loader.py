@@ -0,0 +1,168 @@
+"""Streaming grammar loader.
+
+    from loader import load_grammar
+    grammar = load_grammar("expr.grammar")
+
+The input is read one line at a time (optionally from a memory map) and
+accepts the Grammar string syntax plus a few extensions:
+
+    # comments run to the end of the line (also //)
+    E  -> T E'                 # definitions may span lines
+    E' -> '+' T E' | ε ;       # quoted terminals, optional ';'
+    T ::= F T'                 # BNF-style ::= is the same as ->
+    E' -> '-' T E'             # a repeated left-hand side adds alternatives
+
+An empty alternative (`A -> a |`) means ε. Symbols are interned while
+reading, so every occurrence of a name shares one string.
+"""
+import mmap
+import re
+
+from toc import Grammar
+
+TOKEN = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<comment>(?:\#|//).*)
+  | (?P<arrow>->|::=)
+  | (?P<bar>\|)
+  | (?P<semi>;)
+  | '(?P<single>[^']*)'
+  | "(?P<double>[^"]*)"
+  | (?P<unterminated>['"])
+  | (?P<symbol>(?:(?!->|::=|//)[^\s|;\#])+)
+""", re.VERBOSE)
+
+
+class GrammarSyntaxError(ValueError):
+    def __init__(self, message, line, column):
+        self.line = line
+        self.column = column
+        super().__init__(f"{message} at line {line}, column {column}")
+
+
+class GrammarReader:
+    """Builds {lhs: [rule, ...]} from lines fed one at a time"""
+    def __init__(self):
+        self.productions = {}
+        self.symbols = {}  # interning table
+        self.quoted = {}  # quoted terminal -> (line, column) of its first use
+        self.seen = {}  # lhs -> set of rule tuples, to merge repeats
+        self.lhs = None
+        self.alternatives = []
+        self.alternative = []
+        self.pending = None  # (line, column) of the first symbol outside any definition
+        self.last_bare = None  # (line, column) when the previous token was an unquoted symbol
+        self.line = 0
+
+    def intern(self, name):
+        return self.symbols.setdefault(name, name)
+
+    def feed(self, text):
+        self.line += 1
+        line = self.line
+        pos = 0
+        n = len(text)
+        while pos < n:
+            m = TOKEN.match(text, pos)
+            kind = m.lastgroup
+            column = pos + 1
+            pos = m.end()
+            if kind in ("space", "comment"):
+                continue
+            if kind == "unterminated":
+                raise GrammarSyntaxError("Unterminated quoted terminal", line, column)
+            if kind == "arrow":
+                self.arrow(line, column)
+            elif kind == "bar":
+                if self.lhs is None:
+                    self.no_arrow()
+                    raise GrammarSyntaxError("'|' outside a definition", line, column)
+                self.end_alternative()
+            elif kind == "semi":
+                if self.lhs is None:
+                    self.no_arrow()
+                else:
+                    self.end_definition(line, column)
+            else:
+                if not m.group(kind):  # '' or "": a lexer would match it at every position
+                    raise GrammarSyntaxError("Empty quoted terminal", line, column)
+                name = self.intern(m.group(kind))
+                if kind != "symbol":
+                    self.quoted.setdefault(name, (line, column))
+                if self.lhs is None and self.pending is None:
+                    self.pending = (line, column)
+                self.alternative.append(name)
+                self.last_bare = (line, column) if kind == "symbol" else None
+                continue
+            self.last_bare = None
+
+    def arrow(self, line, column):
+        if self.last_bare is None or not self.alternative:
+            raise GrammarSyntaxError("Expected a non-terminal before '->'", line, column)
+        if self.lhs is None and len(self.alternative) > 1:
+            raise GrammarSyntaxError("Expected a single non-terminal before '->'", *self.pending)
+        lhs = self.alternative.pop()
+        if self.lhs is not None:
+            self.end_definition(line, column)
+        self.lhs = lhs
+        self.alternative = []
+        self.pending = None
+
+    def no_arrow(self):
+        if self.pending is not None:
+            raise GrammarSyntaxError("Expected '->' or '::='", *self.pending)
+
+    def end_alternative(self):
+        self.alternatives.append(self.alternative or ['ε'])
+        self.alternative = []
+
+    def end_definition(self, line, column):
+        if self.alternative or self.alternatives:
+            self.end_alternative()
+        if not self.alternatives:
+            raise GrammarSyntaxError(f"Empty production for {self.lhs}", line, column)
+        rules = self.productions.setdefault(self.lhs, [])
+        seen = self.seen.setdefault(self.lhs, set())
+        for rule in self.alternatives:
+            key = tuple(rule)
+            if key not in seen:
+                seen.add(key)
+                rules.append(rule)
+        self.lhs = None
+        self.alternatives = []
+
+    def finish(self):
+        """Closes the last definition and returns the productions"""
+        if self.lhs is not None:
+            self.end_definition(self.line, 1)
+        self.no_arrow()
+        if not self.productions:
+            raise GrammarSyntaxError("No productions", max(self.line, 1), 1)
+        for name, (line, column) in self.quoted.items():
+            if name in self.productions:
+                raise GrammarSyntaxError(f"Quoted terminal '{name}' is also a non-terminal", line, column)
+        return self.productions
+
+
+def read_productions(lines):
+    """{lhs: [rule, ...]} from an iterable of text lines, in order of first definition"""
+    reader = GrammarReader()
+    for line in lines:
+        reader.feed(line)
+    return reader.finish()
+
+
+def read_file(path, use_mmap=False, encoding="utf-8"):
+    if not use_mmap:
+        with open(path, encoding=encoding) as f:
+            return read_productions(f)
+    with open(path, "rb") as f:
+        if f.seek(0, 2) == 0:
+            return read_productions([])
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            return read_productions(line.decode(encoding) for line in iter(buffer.readline, b""))
+
+
+def load_grammar(path, use_mmap=False, encoding="utf-8", **kwargs):
+    """Grammar built from a grammar file; keyword arguments go to Grammar()"""
+    return Grammar(read_file(path, use_mmap, encoding), **kwargs)
@@ -0,0 +1,113 @@
+from array import array
+
+
+class ParseTree:
+    """Parse tree stored as parallel integer arrays, one slot per node.
+
+    Node 0 is the root. For node i: symbol[i] is a CompiledGrammar symbol id,
+    parent[i] the parent index (-1 for the root), the children occupy the
+    consecutive indices first_child[i] .. first_child[i] + child_count[i] - 1,
+    and start[i]:end[i] is the token span it derives. Children are always
+    allocated after their parent. Python objects are only created by the
+    views below (node(), edges(), to_dot()).
+    """
+    def __init__(self, symbols, tokens=None):
+        self.symbols = symbols  # id -> name table of the CompiledGrammar
+        self.tokens = tokens
+        self.symbol = array('i')
+        self.parent = array('i')
+        self.first_child = array('i')
+        self.child_count = array('i')
+        self.start = array('i')
+        self.end = array('i')
+
+    def __len__(self):
+        return len(self.symbol)
+
+    def add(self, symbol, parent, position):
+        index = len(self.symbol)
+        self.symbol.append(symbol)
+        self.parent.append(parent)
+        self.first_child.append(-1)
+        self.child_count.append(0)
+        self.start.append(position)
+        self.end.append(position)
+        return index
+
+    def close_spans(self):
+        """Propagates each node's end position to its ancestors (children follow parents)"""
+        parent = self.parent
+        end = self.end
+        for index in range(len(parent) - 1, 0, -1):
+            up = parent[index]
+            if end[index] > end[up]:
+                end[up] = end[index]
+
+    def label(self, index):
+        return self.symbols[self.symbol[index]]
+
+    def children(self, index):
+        first = self.first_child[index]
+        if first < 0:
+            return range(0)
+        return range(first, first + self.child_count[index])
+
+    def node(self, index=0):
+        return ParseNode(self, index)
+
+    def edges(self):
+        """(parent index, child index) pairs in allocation order"""
+        parent = self.parent
+        for index in range(1, len(parent)):
+            yield parent[index], index
+
+    def to_dot(self, max_nodes=None):
+        """Graphviz DOT source for the first max_nodes nodes"""
+        count = len(self) if max_nodes is None else min(len(self), max_nodes)
+        lines = ["digraph {"]
+        for index in range(count):
+            label = self.label(index).replace('\\', '\\\\').replace('"', '\\"')
+            lines.append(f'  {index} [label="{label}"];')
+        for up, index in self.edges():
+            if index >= count:
+                break
+            lines.append(f"  {up} -> {index};")
+        lines.append("}")
+        return "\n".join(lines)
+
+
+class ParseNode:
+    """View of one node of a ParseTree; created on demand"""
+    __slots__ = ("tree", "index")
+
+    def __init__(self, tree, index):
+        self.tree = tree
+        self.index = index
+
+    @property
+    def symbol(self):
+        return self.tree.label(self.index)
+
+    @property
+    def parent(self):
+        up = self.tree.parent[self.index]
+        return None if up < 0 else ParseNode(self.tree, up)
+
+    @property
+    def children(self):
+        return [ParseNode(self.tree, index) for index in self.tree.children(self.index)]
+
+    @property
+    def span(self):
+        return self.tree.start[self.index], self.tree.end[self.index]
+
+    @property
+    def text(self):
+        if self.tree.tokens is None:
+            return None
+        start, end = self.span
+        return self.tree.tokens[start:end]
+
+    def __repr__(self):
+        start, end = self.span
+        return f"ParseNode({self.symbol!r}, {start}:{end})"
@@ -0,0 +1,94 @@
+import functools
+import json
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+
+class ParseStats:
+    """Opt-in counters for grammar analysis and parsing.
+
+    Attach one to a Grammar (Grammar(text, stats=ParseStats())) or a
+    PredictiveParser. Every analysis phase and parse entry point then adds
+    its wall time to `phases`; parse() and parse_compiled() also count
+    expansions per non-terminal, hits per table cell, ε-expansions, the
+    longest run of ε-expansions without a match and the deepest stack.
+    Without a stats object none of this is collected.
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.phases = {}  # name -> [calls, seconds]
+        self.expansions = Counter()  # non-terminal -> expansions
+        self.epsilon_expansions = Counter()  # non-terminal -> expansions into ε
+        self.cells = Counter()  # (non-terminal, terminal, production) -> hits
+        self.max_stack_depth = 0
+        self.max_epsilon_chain = 0
+        self.parses = 0
+        self.tokens = 0
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry = self.phases.setdefault(name, [0, 0.0])
+            entry[0] += 1
+            entry[1] += time.perf_counter() - start
+
+    def record_expansion(self, non_terminal, terminal, production, count=1):
+        self.expansions[non_terminal] += count
+        self.cells[non_terminal, terminal, ' '.join(production)] += count
+        if production == ['ε']:
+            self.epsilon_expansions[non_terminal] += count
+
+    def record_depth(self, stack_depth, epsilon_chain):
+        """epsilon_chain: ε-expansions since the last terminal match"""
+        if stack_depth > self.max_stack_depth:
+            self.max_stack_depth = stack_depth
+        if epsilon_chain > self.max_epsilon_chain:
+            self.max_epsilon_chain = epsilon_chain
+
+    def record_parse(self, tokens, max_stack_depth=0, max_epsilon_chain=0):
+        self.parses += 1
+        self.tokens += tokens
+        self.record_depth(max_stack_depth, max_epsilon_chain)
+
+    def to_dict(self):
+        return {
+            "phases": {name: {"calls": calls, "seconds": seconds} for name, (calls, seconds) in self.phases.items()},
+            "parses": self.parses,
+            "tokens": self.tokens,
+            "max_stack_depth": self.max_stack_depth,
+            "max_epsilon_chain": self.max_epsilon_chain,
+            "expansions": dict(self.expansions.most_common()),
+            "epsilon_expansions": dict(self.epsilon_expansions.most_common()),
+            "cells": [
+                {"non_terminal": lhs, "terminal": terminal, "production": production, "hits": hits}
+                for (lhs, terminal, production), hits in self.cells.most_common()
+            ],
+        }
+
+    def to_json(self, path=None, indent=2):
+        """JSON text of to_dict(); also written to `path` when given"""
+        text = json.dumps(self.to_dict(), indent=indent, ensure_ascii=False)
+        if path is not None:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text + "\n")
+        return text
+
+
+def timed(name):
+    """Times a Grammar/PredictiveParser method under `name` when its `stats` is set"""
+    def decorate(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            stats = self.stats
+            if stats is None:
+                return method(self, *args, **kwargs)
+            with stats.phase(name):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorate
@@ -0,0 +1,349 @@
+"""Headless parsing service over HTTP (TCP or Unix socket).
+
+    python service.py --port 8765 --workers 4 --grammar expr=expr.grammar
+
+    GET    /grammars                  -> {"grammars": [...]}
+    POST   /grammars                  {"name": ..., "grammar": "E -> T E'; ..."}
+    DELETE /grammars/<name>
+    POST   /parse                     {"grammar": name, "tokens": [...]}
+                                      or "inputs": [[...], ...] or "text": "..."
+
+Grammars are analyzed once at registration (grammars with LL(1) conflicts
+or unproductive non-terminals are refused), or loaded from the on-disk
+GrammarCache when a process has analyzed the same grammar before.
+Concurrent parse requests for the same grammar are collected for up to
+batch_delay seconds (or max_batch inputs) and parsed together on the
+worker pool.
+"""
+import argparse
+import asyncio
+import json
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+from analysis import useless_symbols
+from grammar_cache import DEFAULT_DIRECTORY, GrammarCache, analyze
+from lexer import LexError, Lexer
+from loader import read_file
+
+# Worker-process cache of unpickled CompiledGrammars, keyed by (name, version)
+_worker_grammars = {}
+
+
+def _parse_each(compiled, inputs):
+    """(result, None) or (None, error message) per input, so a bad input fails alone"""
+    run = compiled.run
+    results = []
+    for tokens in inputs:
+        try:
+            results.append((run(tokens)[0], None))
+        except Exception as e:
+            results.append((None, f"{type(e).__name__}: {e}"))
+    return results
+
+
+def _parse_batch(key, inputs, live, blob=None):
+    """Parses with this worker's copy of grammar `key`.
+
+    Returns None when the worker has not installed the grammar yet and no
+    blob was sent, so the blob only travels to workers that miss it.
+    Grammars whose key is no longer in `live` (deleted or re-registered)
+    are dropped first.
+    """
+    for stale in _worker_grammars.keys() - live:
+        del _worker_grammars[stale]
+    compiled = _worker_grammars.get(key)
+    if compiled is None:
+        if blob is None:
+            return None
+        compiled = _worker_grammars[key] = pickle.loads(blob)
+    return _parse_each(compiled, inputs)
+
+
+def _token_list(tokens):
+    if not isinstance(tokens, list) or not all(isinstance(token, str) for token in tokens):
+        raise ServiceError(400, "Expected a list of string tokens")
+    return tokens
+
+
+class ServiceError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class RegisteredGrammar:
+    def __init__(self, key, grammar):
+        self.key = key
+        self.grammar = grammar
+        self.compiled = grammar.compile()
+        self.blob = pickle.dumps(self.compiled, protocol=pickle.HIGHEST_PROTOCOL)  # shipped to workers
+        self.lexer = Lexer.from_grammar(grammar)
+        self.pending = []  # (tokens, future) waiting for the next batch
+        self.flush_handle = None
+
+
+class ParsingService:
+    """Grammar registry plus micro-batched parsing; request() is the whole API"""
+    def __init__(self, workers=0, batch_delay=0.002, max_batch=256, cache=None):
+        self.grammars = {}
+        self.cache = cache  # optional GrammarCache for registrations
+        self.batch_delay = batch_delay
+        self.max_batch = max_batch
+        self.pool = ProcessPoolExecutor(max_workers=workers) if workers else None
+        self.registrations = 0
+        self.batches = set()  # running run_batch tasks; the event loop only keeps weak references
+
+    async def register(self, name, text):
+        loop = asyncio.get_running_loop()
+        try:
+            build = analyze if self.cache is None else self.cache.get
+            grammar = await loop.run_in_executor(None, build, text)
+        except (ValueError, IndexError, KeyError) as e:
+            raise ServiceError(400, f"Invalid grammar: {e}")
+        # The parser would expand forever on a conflicting cell or an unproductive cycle
+        if grammar.conflicts:
+            conflicts = "; ".join(
+                f"{c.lhs} on '{c.terminal}': " + " | ".join(" ".join(rule) for rule in c.productions)
+                for c in sorted(grammar.conflicts))
+            raise ServiceError(400, f"Grammar is not LL(1): {conflicts}")
+        unproductive, _ = useless_symbols(grammar.productions, grammar.start_symbol)
+        if unproductive:
+            raise ServiceError(400, f"Non-terminals derive no terminal string: {', '.join(sorted(unproductive))}")
+        self.registrations += 1
+        self.grammars[name] = RegisteredGrammar((name, self.registrations), grammar)
+        return {"name": name, "non_terminals": len(grammar.non_terminals), "terminals": len(grammar.terminals)}
+
+    def parse(self, name, tokens):
+        """Queues one token list; the returned future resolves to the parse result string"""
+        entry = self.grammars.get(name)
+        if entry is None:
+            raise ServiceError(404, f"Unknown grammar '{name}'")
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        entry.pending.append((tokens, future))
+        if len(entry.pending) >= self.max_batch:
+            self.flush(entry)
+        elif entry.flush_handle is None:
+            entry.flush_handle = loop.call_later(self.batch_delay, self.flush, entry)
+        return future
+
+    def flush(self, entry):
+        if entry.flush_handle is not None:
+            entry.flush_handle.cancel()
+            entry.flush_handle = None
+        batch, entry.pending = entry.pending, []
+        if batch:
+            task = asyncio.ensure_future(self.run_batch(entry, batch))
+            self.batches.add(task)
+            task.add_done_callback(self.batches.discard)
+
+    async def run_batch(self, entry, batch):
+        inputs = [tokens for tokens, _ in batch]
+        try:
+            if self.pool is None:
+                results = _parse_each(entry.compiled, inputs)
+            else:
+                loop = asyncio.get_running_loop()
+                live = frozenset(registered.key for registered in self.grammars.values()) | {entry.key}
+                results = await loop.run_in_executor(self.pool, _parse_batch, entry.key, inputs, live)
+                if results is None:
+                    results = await loop.run_in_executor(self.pool, _parse_batch, entry.key, inputs, live, entry.blob)
+        except Exception as e:  # the pool itself failed; no input got parsed
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), (result, error) in zip(batch, results):
+            if future.done():
+                continue
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(ServiceError(500, f"Parse failed: {error}"))
+
+    async def request(self, method, path, payload=None):
+        """Dispatches one API call; returns (status, JSON-able body)"""
+        if payload is None:
+            payload = {}
+        if not isinstance(payload, dict):
+            return 400, {"error": "Expected a JSON object"}
+        try:
+            return 200, await self._dispatch(method, path, payload)
+        except ServiceError as e:
+            return e.status, {"error": str(e)}
+        except Exception as e:
+            return 500, {"error": f"Internal error: {type(e).__name__}: {e}"}
+
+    async def _dispatch(self, method, path, payload):
+        if path == "/grammars" and method == "GET":
+            return {"grammars": sorted(self.grammars)}
+        if path == "/grammars" and method == "POST":
+            if not isinstance(payload.get("name"), str) or not isinstance(payload.get("grammar"), str):
+                raise ServiceError(400, "Expected 'name' and 'grammar' strings")
+            return await self.register(payload["name"], payload["grammar"])
+        if path.startswith("/grammars/") and method == "DELETE":
+            name = path[len("/grammars/"):]
+            if self.grammars.pop(name, None) is None:
+                raise ServiceError(404, f"Unknown grammar '{name}'")
+            return {"deleted": name}
+        if path == "/parse" and method == "POST":
+            name = payload.get("grammar")
+            if name not in self.grammars:
+                raise ServiceError(404, f"Unknown grammar '{name}'")
+            if "inputs" in payload:
+                if not isinstance(payload["inputs"], list):
+                    raise ServiceError(400, "Expected 'inputs' to be a list of token lists")
+                inputs = [_token_list(tokens) for tokens in payload["inputs"]]
+                results = await asyncio.gather(*(self.parse(name, tokens) for tokens in inputs))
+                return {"results": list(results)}
+            if "text" in payload:
+                if not isinstance(payload["text"], str):
+                    raise ServiceError(400, "Expected 'text' to be a string")
+                try:
+                    tokens = list(self.grammars[name].lexer.tokens(payload["text"]))
+                except LexError as e:
+                    return {"result": f"\nError: {e}"}
+            elif "tokens" in payload:
+                tokens = _token_list(payload["tokens"])
+            else:
+                raise ServiceError(400, "Expected 'tokens', 'inputs' or 'text'")
+            return {"result": await self.parse(name, tokens)}
+        raise ServiceError(404, f"No route for {method} {path}")
+
+    async def handle_connection(self, reader, writer):
+        """Minimal HTTP/1.1 with keep-alive and Content-Length bodies"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                try:
+                    payload = json.loads(body) if body else {}
+                    status, response = await self.request(method, path, payload)
+                except json.JSONDecodeError as e:
+                    status, response = 400, {"error": f"Invalid JSON: {e}"}
+                data = json.dumps(response).encode("utf-8")
+                reason = {200: "OK", 400: "Bad Request", 404: "Not Found",
+                          500: "Internal Server Error"}.get(status, "Error")
+                writer.write(f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+                             f"Content-Length: {len(data)}\r\n\r\n".encode("latin-1") + data)
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            pass  # client went away, or the server is shutting down
+        finally:
+            writer.close()
+
+    async def start(self, host="127.0.0.1", port=8765, unix_path=None):
+        if unix_path:
+            return await asyncio.start_unix_server(self.handle_connection, unix_path)
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+
+
+class Client:
+    """HTTP client for the service, over one keep-alive connection"""
+    def __init__(self, host="127.0.0.1", port=8765, unix_path=None):
+        self.host = host
+        self.port = port
+        self.unix_path = unix_path
+        self.reader = self.writer = None
+
+    async def connect(self):
+        if self.unix_path:
+            self.reader, self.writer = await asyncio.open_unix_connection(self.unix_path)
+        else:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def request(self, method, path, payload=None):
+        if self.writer is None:
+            await self.connect()
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        self.writer.write(f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Type: application/json\r\n"
+                          f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body)
+        await self.writer.drain()
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            if key.strip().lower() == "content-length":
+                length = int(value)
+        return status, json.loads(await self.reader.readexactly(length))
+
+    async def register(self, name, grammar):
+        return await self.request("POST", "/grammars", {"name": name, "grammar": grammar})
+
+    async def parse(self, name, tokens):
+        return await self.request("POST", "/parse", {"grammar": name, "tokens": tokens})
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            await self.writer.wait_closed()
+            self.reader = self.writer = None
+
+
+async def register_files(service, specs):
+    """Registers NAME=PATH grammar files, read with the loader syntax like compile_grammars.py"""
+    for spec in specs:
+        name, _, path = spec.partition("=")
+        try:
+            await service.register(name, read_file(path))
+        except (ServiceError, ValueError, OSError) as e:  # ValueError: GrammarSyntaxError
+            raise SystemExit(f"{path}: {e}")
+
+
+async def run_service(args):
+    cache = None if args.no_cache else GrammarCache(args.cache_dir)
+    service = ParsingService(args.workers, args.batch_delay, args.max_batch, cache)
+    try:
+        await register_files(service, args.grammar)
+        server = await service.start(args.host, args.port, args.unix)
+        print(f"Serving on {args.unix or f'{args.host}:{args.port}'}")
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="LL(1) parsing service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="listen on this Unix socket path instead of TCP")
+    parser.add_argument("--workers", type=int, default=0, help="parser processes (0 parses in the event loop)")
+    parser.add_argument("--batch-delay", type=float, default=0.002, help="seconds to collect a batch")
+    parser.add_argument("--max-batch", type=int, default=256)
+    parser.add_argument("--cache-dir", default=DEFAULT_DIRECTORY, help="directory of analyzed grammars")
+    parser.add_argument("--no-cache", action="store_true", help="analyze every grammar from scratch")
+    parser.add_argument("--grammar", action="append", default=[], metavar="NAME=PATH",
+                        help="register a grammar file at startup (repeatable)")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(run_service(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,175 @@
+import time
+from collections import OrderedDict, deque
+
+import pandas as pd
 import streamlit as st
 from graphviz import Digraph
-from toc import Grammar, PredictiveParser
+from grammar_cache import GrammarCache
+from lexer import LexError, Lexer
+from profiling import ParseStats
+from toc import Grammar, PredictiveParser, Tracer
 
-def visualize_parse_tree(parse_tree):
+def visualize_parse_tree(parse_tree, max_nodes=300):
     dot = Digraph()
-    for parent, children in parse_tree:
-        dot.node(parent, parent)
-        for child in children:
-            dot.node(child, child)
-            dot.edge(parent, child)
+    count = min(len(parse_tree), max_nodes)
+    for index in range(count):
+        dot.node(str(index), parse_tree.label(index))
+    for parent, child in parse_tree.edges():
+        if child >= count:
+            break
+        dot.edge(str(parent), str(child))
     return dot
 
+def parse_token_classes(text):
+    """`name = regex` per line -> {name: regex}"""
+    classes = {}
+    for line in text.splitlines():
+        if "=" in line:
+            name, pattern = line.split("=", 1)
+            classes[name.strip()] = pattern.strip()
+    return classes
+
+TRANSFORMS = {
+    "left_recursion": Grammar.remove_left_recursion,
+    "useless_symbols": Grammar.remove_useless_symbols,
+    "common_prefixes": Grammar.remove_common_prefixes,
+}
+
+GRAMMAR_CACHE_SIZE = 16
+
+@st.cache_resource
+def disk_cache():
+    """GrammarCache shared by every session; entries are files, so sessions never share a Grammar object"""
+    return GrammarCache()
+
+def build_grammar(text, transforms, stats=None):
+    """Grammar for `text` with every analysis stage computed, and the report of each transformation"""
+    grammar = Grammar(text, stats=stats)
+    reports = [TRANSFORMS[name](grammar) for name in transforms]
+    grammar.compile()
+    grammar.conflicts  # evaluated for its side effect: the stage is memoized before the grammar is shared
+    grammar.stats = None
+    return grammar, reports
+
+def analyzed_grammar(text, transforms=(), stats=None):
+    """Grammar for `text` after the named transformations, kept across reruns.
+
+    Each session has its own small LRU cache keyed by the grammar text and
+    the transformation history, so no Grammar is shared between sessions.
+    A session miss loads the analyzed grammar from the on-disk GrammarCache,
+    building and storing it only when no process has analyzed it yet.
+    Every analysis stage (sets, table, conflicts, compiled table) is computed
+    before the grammar is cached and is never recomputed or mutated after;
+    `stats` only times that build and is not kept on the grammar. Returns
+    the grammar and the return value of each transformation.
+    """
+    cache = st.session_state.setdefault('grammar_cache', OrderedDict())
+    key = (text, tuple(transforms))
+    if key in cache:
+        cache.move_to_end(key)
+        return cache[key]
+    cache[key] = disk_cache().get(text, lambda text: build_grammar(text, transforms, stats), ",".join(transforms))
+    while len(cache) > GRAMMAR_CACHE_SIZE:
+        cache.popitem(last=False)
+    return cache[key]
+
+def rule_text(rules):
+    return ' | '.join(' '.join(rule) for rule in rules)
+
+def symbol_filter(label, key):
+    """Case-insensitive substring filter; an empty pattern keeps everything"""
+    pattern = st.text_input(label, key=key).strip().lower()
+    return lambda symbol: pattern in symbol.lower()
+
+def paginate(items, key, page_size=50):
+    """Slice of `items` for the page picked by a number input under `key`"""
+    pages = max(1, -(-len(items) // page_size))
+    page = st.number_input(f"Page (of {pages}, {len(items)} rows)", 1, pages, 1, key=key) if pages > 1 else 1
+    return items[(page - 1) * page_size:page * page_size]
+
+def show_productions(grammar, key):
+    keep = symbol_filter("Filter non-terminals", f"{key}_filter")
+    rows = [(lhs, rule_text(rules)) for lhs, rules in grammar.productions.items() if keep(lhs)]
+    st.dataframe(pd.DataFrame(paginate(rows, f"{key}_page"), columns=["Non-terminal", "Productions"]),
+                 use_container_width=True, hide_index=True)
+
+def show_sets(name, sets, key):
+    keep = symbol_filter(f"Filter {name} by symbol", f"{key}_filter")
+    rows = [(symbol, ' '.join(sorted(values))) for symbol, values in sets.items() if keep(symbol)]
+    st.dataframe(pd.DataFrame(paginate(rows, f"{key}_page"), columns=["Symbol", name]),
+                 use_container_width=True, hide_index=True)
+
+def show_table(grammar):
+    """One page of the sparse parse table, restricted to the filtered terminals"""
+    table = grammar.parse_table
+    col1, col2 = st.columns(2)
+    with col1:
+        keep_lhs = symbol_filter("Filter non-terminals", "table_rows")
+    with col2:
+        keep_terminal = symbol_filter("Filter terminals", "table_columns")
+    terminals = [terminal for terminal in sorted(grammar.terminals) if keep_terminal(terminal)]
+    page = paginate([lhs for lhs in table if keep_lhs(lhs)], "table_page")
+    rows = [[' '.join(table[lhs][terminal]) if terminal in table[lhs] else "" for terminal in terminals]
+            for lhs in page]
+    st.dataframe(pd.DataFrame(rows, index=page, columns=terminals), use_container_width=True)
+
+def show_stats(stats):
+    data = stats.to_dict()
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Parses", data["parses"])
+    col2.metric("Max stack depth", data["max_stack_depth"])
+    col3.metric("Longest ε chain", data["max_epsilon_chain"])
+    st.subheader("Phase Timings")
+    st.table([[name, phase["calls"], f"{phase['seconds'] * 1000:.3f}"] for name, phase in data["phases"].items()]
+             or [["-", 0, "0"]])
+    st.subheader("Expansions per Non-terminal")
+    st.table([[nt, count, data["epsilon_expansions"].get(nt, 0)] for nt, count in data["expansions"].items()]
+             or [["-", 0, 0]])
+    st.subheader("Hottest Table Cells")
+    st.table([[cell["non_terminal"], cell["terminal"], cell["production"], cell["hits"]] for cell in data["cells"][:20]]
+             or [["-", "-", "-", 0]])
+    st.download_button("Download stats JSON", stats.to_json(), file_name="parse_stats.json")
+
+class StepWindow:
+    """Keeps the last `size` parse steps and redraws them at most every `interval` seconds"""
+    def __init__(self, size, placeholder, interval=0.2):
+        self.steps = deque(maxlen=size)
+        self.placeholder = placeholder
+        self.interval = interval
+        self.count = 0
+        self.drawn = 0.0
+
+    def expand(self, top, production, token):
+        self.add(f"{top} -> {' '.join(production)}  (input '{token}')")
+
+    def add(self, step):
+        self.count += 1
+        self.steps.append(step)
+        now = time.perf_counter()
+        if now - self.drawn >= self.interval:
+            self.drawn = now
+            self.render()
+
+    def render(self):
+        shown = len(self.steps)
+        header = f"steps {self.count - shown + 1}-{self.count} of {self.count}" if shown else "no steps"
+        self.placeholder.text(header + "\n" + "\n".join(self.steps))
+
+def select_grammar(text):
+    """Makes `text` the working grammar, with no transformations applied yet"""
+    if st.session_state.get('grammar_text') != text:
+        st.session_state.grammar_text = text
+        st.session_state.transforms = []
+        st.session_state.views = set()
+
 def main():
     st.title("Grammar Parser and Visualizer")
 
+    profile = st.sidebar.checkbox("Collect profiling stats")
+    if profile and 'stats' not in st.session_state:
+        st.session_state.stats = ParseStats()
+    stats = st.session_state.stats if profile else None
+
     # Input for grammar
     grammar_input = st.text_area("Enter your grammar (e.g., S->( L )|a; L-> L, S|S):")
     
@@ -22,8 +178,7 @@ def main():
     with col1:
         if st.button("Validate Grammar"):
             try:
-                # Create grammar instance
-                grammar = Grammar(grammar_input)
+                grammar, _ = analyzed_grammar(grammar_input, (), stats)
                 
                 # Basic validation
                 if not grammar.productions:
@@ -42,13 +197,12 @@ def main():
 
                 if valid:
                     st.success("Grammar is valid for LL(1) parsing!")
-                    st.session_state.grammar = grammar  # Store grammar in session state
+                    select_grammar(grammar_input)
                     
                     # Show validation details
                     with st.expander("See Validation Details"):
-                        st.write("Terminals:", grammar.terminals)
-                        st.write("Non-terminals:", grammar.non_terminals)
-                        st.write("Productions:", grammar.productions)
+                        st.write(f"{len(grammar.terminals)} terminals, {len(grammar.non_terminals)} non-terminals, "
+                                 f"{sum(len(rules) for rules in grammar.productions.values())} productions")
                 else:
                     st.error("Grammar Validation Failed:")
                     for msg in validation_messages:
@@ -60,94 +214,143 @@ def main():
     with col2:
         if st.button("Continue with Grammar"):
             try:
-                grammar = Grammar(grammar_input)
-                st.session_state.grammar = grammar
+                analyzed_grammar(grammar_input, (), stats)
+                select_grammar(grammar_input)
                 st.success("Proceeding with the grammar processing.")
             except Exception as e:
                 st.error(f"Error processing grammar: {str(e)}")
 
-    if 'grammar' in st.session_state:
-        grammar = st.session_state.grammar
+    if 'grammar_text' in st.session_state:
+        text = st.session_state.grammar_text
+        transforms = st.session_state.transforms
+        try:
+            grammar, reports = analyzed_grammar(text, tuple(transforms), stats)
+        except ValueError as e:  # e.g. the start symbol turned out to be unproductive
+            st.error(str(e))
+            transforms.pop()
+            grammar, reports = analyzed_grammar(text, tuple(transforms), stats)
+        views = st.session_state.views
 
         # Display initial grammar
         st.subheader("Initial Grammar")
-        for lhs, rules in grammar.productions.items():
-            st.write(f"{lhs} -> {' | '.join([' '.join(rule) for rule in rules])}")
+        show_productions(analyzed_grammar(text, (), stats)[0], "initial")
 
         # Create tabs for different operations
-        tab1, tab2, tab3 = st.tabs(["Grammar Transformations", "Sets Computation", "Parsing"])
+        tab1, tab2, tab3, tab4 = st.tabs(["Grammar Transformations", "Sets Computation", "Parsing", "Profiling"])
 
         with tab1:
-            # Buttons for grammar conversion
-            if st.button("Remove Left Recursion"):
-                grammar.remove_left_recursion()
-                st.success("Left recursion removed!")
-                st.subheader("Grammar after Left Recursion Removal")
-                for lhs, rules in grammar.productions.items():
-                    st.write(f"{lhs} -> {' | '.join([' '.join(rule) for rule in rules])}")
-
-            if st.button("Remove Common Prefixes"):
-                grammar.remove_common_prefixes()
-                st.success("Common prefixes removed!")
-                st.subheader("Grammar after Common Prefix Removal")
-                for lhs, rules in grammar.productions.items():
-                    st.write(f"{lhs} -> {' | '.join([' '.join(rule) for rule in rules])}")
+            # Buttons for grammar conversion; each one reruns with a longer transformation history
+            for label, name in [("Remove Left Recursion", "left_recursion"),
+                                ("Remove Useless Symbols", "useless_symbols"),
+                                ("Remove Common Prefixes", "common_prefixes")]:
+                if st.button(label):
+                    transforms.append(name)
+                    views.clear()
+                    st.rerun()
+
+            if transforms:
+                st.success("Applied: " + ", ".join(transforms))
+                if transforms[-1] == "useless_symbols":
+                    report = reports[-1]
+                    st.write(f"Removed {len(report.removed_rules)} rules")
+                    st.write("Unproductive:", report.unproductive or "none")
+                    st.write("Unreachable:", report.unreachable or "none")
+                if st.button("Reset Transformations"):
+                    transforms.clear()
+                    views.clear()
+                    st.rerun()
+                st.subheader("Transformed Grammar")
+                show_productions(grammar, "transformed")
 
         with tab2:
             col1, col2 = st.columns(2)
             with col1:
                 if st.button("Compute FIRST"):
-                    grammar.compute_first()
+                    views.add("first")
+                if "first" in views:
+                    first = grammar.first  # memoized: computed at most once per grammar version
                     st.success("FIRST sets computed!")
                     st.subheader("FIRST Sets")
-                    for symbol, first_set in grammar.first.items():
-                        st.write(f"FIRST({symbol}) = {first_set}")
+                    show_sets("FIRST", first, "first")
 
             with col2:
                 if st.button("Compute FOLLOW"):
-                    grammar.compute_follow()
+                    views.add("follow")
+                if "follow" in views:
+                    follow = grammar.follow
                     st.success("FOLLOW sets computed!")
                     st.subheader("FOLLOW Sets")
-                    for symbol, follow_set in grammar.follow.items():
-                        st.write(f"FOLLOW({symbol}) = {follow_set}")
+                    show_sets("FOLLOW", follow, "follow")
 
             if st.button("Construct Predictive Table"):
-                grammar.construct_predictive_table()
+                views.add("table")
+            if "table" in views:
                 st.success("Predictive parsing table constructed!")
                 st.subheader("Predictive Parsing Table")
-                
-                # Create a dataframe for better visualization
-                terminals = sorted(grammar.terminals)
-                table_data = []
-                for lhs in grammar.predictive_table:
-                    row = [lhs]
-                    for terminal in terminals:
-                        production = grammar.predictive_table[lhs].get(terminal, "nil")
-                        if isinstance(production, list):
-                            production = ' '.join(production)
-                        row.append(production)
-                    table_data.append(row)
-                
-                # Display the table
-                st.table([['Non-terminal'] + terminals] + table_data)
+                show_table(grammar)
+
+                if grammar.conflicts:
+                    st.warning(f"Grammar is not LL(1): {len(grammar.conflicts)} conflicting cells")
+                    rows = [(c.lhs, c.terminal, c.kind, ' | '.join(' '.join(p) for p in c.productions))
+                            for c in sorted(grammar.conflicts)]
+                    st.dataframe(pd.DataFrame(paginate(rows, "conflicts_page"),
+                                              columns=["Non-terminal", "Terminal", "Kind", "Productions"]),
+                                 use_container_width=True, hide_index=True)
 
         with tab3:
             # Input for parsing
-            input_string = st.text_input("Enter input string to parse (e.g., ( a , a ) ):")
+            input_string = st.text_input("Enter input string to parse (e.g., (a,a) ):")
+            token_classes = st.text_area("Token classes, one `name = regex` per line (optional, e.g. id = [a-z]\\w*):")
+            window = st.slider("Parse steps to keep on screen", 20, 1000, 200, step=20)
             
             if st.button("Parse Input"):
                 if input_string.strip():
-                    parser = PredictiveParser(grammar)
-                    result = parser.parse(input_string.split())
+                    lexer = Lexer.from_grammar(grammar, parse_token_classes(token_classes))
+                    try:
+                        tokens = list(lexer.tokens(input_string))
+                    except LexError as e:
+                        st.error(str(e))
+                        return
+                    st.subheader("Parsing Steps")
+                    steps = StepWindow(window, st.empty())
+                    tracer = Tracer(
+                        on_expand=steps.expand,
+                        on_match=lambda token: steps.add(f"match '{token}'"),
+                        on_error=lambda message: steps.add(message.strip()),
+                    )
+                    # One pass gives the steps, the result, the stack where it stopped, the tree
+                    # and the profiling counters
+                    parser = PredictiveParser(grammar, tracer, stats)
+                    result = parser.parse_compiled(tokens, build_tree=True)
+                    steps.render()
                     st.write("Parsing Result:", result)
+                    # Only a failed parse needs the recovering pass that finds the later errors
+                    errors = [] if result == "Input parsed successfully." else PredictiveParser(grammar, stats=stats).parse_all(tokens)
+                    if len(errors) > 1:
+                        with st.expander(f"All Syntax Errors ({len(errors)})"):
+                            st.dataframe(pd.DataFrame([(position, message.strip()) for position, message in errors],
+                                                      columns=["Token", "Error"]),
+                                         use_container_width=True, hide_index=True)
+
+                    if len(parser.tree) > 1:
+                        st.subheader("Parse Tree")
+                        st.graphviz_chart(visualize_parse_tree(parser.tree))
 
-                    # Display parsing steps
+                    # Display the parser state where it stopped (ends only, for long inputs)
                     if hasattr(parser, 'stack'):
-                        st.write("Final Stack:", parser.stack)
+                        st.write("Final Stack (top last):", ' '.join(parser.stack[-window:]))
                     if hasattr(parser, 'input_string'):
-                        st.write("Remaining Input:", parser.input_string)
+                        st.write("Remaining Input:", ' '.join(parser.input_string[:window]))
                 else:
                     st.warning("Please enter an input string to parse.")
 
+        with tab4:
+            if stats is None:
+                st.info("Enable 'Collect profiling stats' in the sidebar, then run the analysis and parse steps.")
+            else:
+                if st.button("Reset Stats"):
+                    stats.reset()
+                show_stats(stats)
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
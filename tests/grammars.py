@@ -0,0 +1,40 @@
+"""Grammars and inputs shared by the property tests"""
+import random
+
+import bench
+from toc import Grammar
+
+EXPR = "E -> T E'; E' -> + T E' | ε; T -> F T'; T' -> * F T' | ε; F -> i | ( E )"
+
+
+def random_productions(rng, non_terminals=5, terminals="abc"):
+    names = [f"N{i}" for i in range(non_terminals)]
+    symbols = names + list(terminals) + ['ε']
+    return {name: [[rng.choice(symbols) for _ in range(rng.randint(1, 3))] for _ in range(rng.randint(1, 3))]
+            for name in names}
+
+
+def ll1_grammars(count=40, seed=0):
+    """Generated LL(1) grammars: the bench generator plus random ones without conflicts"""
+    grammars = [Grammar(EXPR)] + [Grammar(bench.generate_grammar(12, 3, 0.3, 3, s)) for s in range(3)]
+    rng = random.Random(seed)
+    while len(grammars) < count:
+        grammar = Grammar(random_productions(rng, rng.randint(2, 6)), skip_validation=True)
+        # The parsers may loop on conflicting grammars, and on unproductive
+        # cycles such as N -> ε N, so grammars are reduced and conflict free
+        try:
+            grammar.remove_useless_symbols()
+        except ValueError:  # nothing productive left
+            continue
+        if not grammar.conflicts:
+            grammars.append(grammar)
+    return grammars
+
+
+def token_lists(grammar, rng, count=150, max_length=12):
+    alphabet = sorted(grammar.terminals - {'ε'} | {'?'})
+    return [[rng.choice(alphabet) for _ in range(rng.randint(0, max_length))] for _ in range(count)]
+
+
+def grammar_id(grammar):
+    return str(len(grammar.productions))
@@ -0,0 +1,43 @@
+import random
+
+from analysis import SetAnalysis, strongly_connected_components
+from grammars import EXPR
+from toc import Grammar
+
+
+def random_productions(rng, non_terminals, terminals="abcd"):
+    names = [f"N{i}" for i in range(non_terminals)]
+    symbols = names + list(terminals) + ['ε', ')']
+    return {name: [[rng.choice(symbols) for _ in range(rng.randint(1, 4))] for _ in range(rng.randint(1, 4))]
+            for name in names}
+
+
+def test_worklist_sets_match_fixpoint_sets():
+    rng = random.Random(5)
+    checked = 0
+    for _ in range(600):
+        grammar = Grammar(random_productions(rng, rng.randint(1, 8)), skip_validation=True)
+        grammar.compute_first()
+        try:
+            grammar.compute_follow()
+        except KeyError:  # compute_follow does not handle every symbol sequence
+            continue
+        analysis = SetAnalysis(grammar.productions, grammar.start_symbol)
+        assert analysis.first_sets() == grammar.first, grammar.productions
+        assert analysis.follow_sets() == grammar.follow, grammar.productions
+        checked += 1
+    assert checked > 200
+
+
+def test_expression_grammar_sets():
+    analysis = SetAnalysis(Grammar(EXPR).productions, "E")
+    assert analysis.first_sets() == {"E": {"i", "("}, "E'": {"+", "ε"}, "T": {"i", "("}, "T'": {"*", "ε"},
+                                     "F": {"i", "("}}
+    assert analysis.follow_sets() == {"E": {"$", ")"}, "E'": {"$", ")"}, "T": {"+", "$", ")"},
+                                      "T'": {"+", "$", ")"}, "F": {"+", "*", "$", ")"}}
+
+
+def test_components_come_out_in_reverse_topological_order():
+    edges = {"a": ["b"], "b": ["a", "c"], "c": [], "d": ["d", "a"]}
+    components = strongly_connected_components(list(edges), edges)
+    assert [sorted(component) for component in components] == [["c"], ["a", "b"], ["d"]]
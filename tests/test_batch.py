@@ -0,0 +1,29 @@
+import random
+
+import pytest
+
+from batch import iter_parse_many, parse_many
+from grammars import EXPR, token_lists
+from toc import Grammar, PredictiveParser
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_parse_many_matches_single_parses_in_input_order(workers):
+    grammar = Grammar(EXPR)
+    inputs = token_lists(grammar, random.Random(3), count=300)
+    expected = [PredictiveParser(grammar).parse(tokens) for tokens in inputs]
+    assert parse_many(grammar, inputs, workers=workers, chunksize=7) == expected
+
+
+def test_iter_parse_many_reads_inputs_lazily():
+    grammar = Grammar(EXPR)
+    read = []
+
+    def inputs():
+        for i in range(1000):
+            read.append(i)
+            yield ["i"]
+
+    results = iter_parse_many(grammar, inputs(), workers=1, chunksize=10)
+    assert next(results) == "Input parsed successfully."
+    assert len(read) == 10
@@ -0,0 +1,18 @@
+import bench
+from toc import Grammar, PredictiveParser
+
+
+def test_sentences_reach_requested_length():
+    grammar = Grammar(bench.generate_grammar(20, 3, 0.3, 3, 1))
+    corpus = list(bench.generate_sentences(grammar, 30000, 5000, 2))
+    lengths = [len(sentence) for sentence in corpus]
+    assert sum(lengths) >= 30000
+    assert all(length >= 5000 for length in lengths[:-1])
+    assert all(PredictiveParser(grammar).parse_compiled(sentence) == "Input parsed successfully."
+               for sentence in corpus)
+
+
+def test_generated_sentences_parse():
+    grammar = Grammar(bench.generate_grammar(30, 3, 0.3, 3, 4))
+    for sentence in bench.generate_sentences(grammar, 2000, 200, 5):
+        assert PredictiveParser(grammar).parse_compiled(list(sentence)) == "Input parsed successfully."
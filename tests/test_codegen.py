@@ -0,0 +1,22 @@
+import warnings
+
+import pytest
+
+from codegen import generate_module
+from toc import Grammar
+
+# Terminals that break naive source generation: string escapes and quotes
+AWKWARD = {"S": [["\\N", "A"], ["\\d"], ['"""', "S"], ["'''"]], "A": [["x\\"], ["ε"]]}
+
+
+@pytest.mark.parametrize("style", ["table", "descent"])
+def test_generated_module_compiles_for_awkward_terminals(style):
+    source = generate_module(Grammar(AWKWARD), style)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")  # invalid escapes must not even warn
+        code = compile(source, f"generated_{style}.py", "exec")
+    namespace = {}
+    exec(code, namespace)
+    assert namespace["GRAMMAR"] == ("S -> \\N A | \\d | \"\"\" S | '''", "A -> x\\ | ε")
+    assert namespace["parse"](['"""', "\\N", "x\\"]) == "Input parsed successfully."
+    assert namespace["parse"](["\\d", "\\d"]) == Grammar(AWKWARD).compile().run(["\\d", "\\d"])[0]
@@ -0,0 +1,73 @@
+import json
+import pickle
+
+import pytest
+
+from compile_grammars import compile_all, find_grammars, main
+
+GRAMMARS = {
+    "expr.grammar": "E -> E '+' T | T\nT -> 'i' | '(' E ')'\n",
+    "nested/list.grammar": "L ::= a R\nR -> ',' a R |\n",
+    "conflict.grammar": "S -> A b | c\nA -> ε | B\nB -> d | ε\n",
+    "broken.grammar": "S -> 'a\n",
+}
+
+
+@pytest.fixture
+def source(tmp_path):
+    root = tmp_path / "grammars"
+    for name, text in GRAMMARS.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+    return root
+
+
+@pytest.mark.parametrize("workers", ["1", "2"])
+def test_directory_compiles_to_pickles_modules_and_a_summary(source, tmp_path, workers):
+    output = tmp_path / "build"
+    assert main([str(source), "--output", str(output), "--workers", workers, "--modules"]) == 1
+    summary = json.loads((output / "summary.json").read_text(encoding="utf-8"))
+    entries = {entry["name"]: entry for entry in summary["grammars"]}
+    assert [entry["name"] for entry in summary["grammars"]] == ["broken", "conflict", "expr", "nested/list"]
+    assert (summary["total"], summary["failed"]) == (4, 2)
+    assert {name: entry["status"] for name, entry in entries.items()} == {
+        "broken": "error", "conflict": "invalid", "expr": "ok", "nested/list": "ok"}
+    assert entries["broken"]["errors"] == ["Unterminated quoted terminal at line 1, column 6"]
+    assert [(c["lhs"], c["terminal"]) for c in entries["conflict"]["conflicts"]] == [("A", "b")]
+
+    with open(output / "expr.pickle", "rb") as f:
+        compiled = pickle.load(f)
+    assert compiled.run(["i", "+", "(", "i", ")"])[0] == "Input parsed successfully."  # left recursion removed
+    assert (output / "nested" / "list.pickle").exists() and (output / "nested" / "list.py").exists()
+    assert not (output / "conflict.py").exists()
+    namespace = {}
+    exec((output / "expr.py").read_text(encoding="utf-8"), namespace)
+    assert namespace["parse"](["i", "+", "i"]) == "Input parsed successfully."
+
+
+def test_manifest_outputs_stay_inside_the_output_directory(source, tmp_path):
+    manifest = source / "manifest.txt"
+    manifest.write_text("# grammars for CI\nexpr.grammar\n./expr.grammar  # same output name\n"
+                        "../grammars/nested/list.grammar\n", encoding="utf-8")
+    grammars = find_grammars(manifest)
+    assert [name for name, _ in grammars] == ["expr", "expr", "../grammars/nested/list"]
+    entries = dict(compile_all(grammars, str(tmp_path / "build"), workers=1))
+    assert entries[0]["status"] == "ok"
+    assert entries[1]["status"] == "error" and "also used by" in entries[1]["errors"][0]
+    assert entries[2]["status"] == "error" and "outside" in entries[2]["errors"][0]
+    assert not (tmp_path / "grammars" / "nested" / "list.pickle").exists()
+
+
+def test_strict_turns_warnings_into_errors(tmp_path):
+    path = tmp_path / "undefined.grammar"
+    path.write_text("S -> a B\n", encoding="utf-8")
+    relaxed = dict(compile_all([("undefined", path)], str(tmp_path / "build"), workers=1))[0]
+    strict = dict(compile_all([("undefined", path)], str(tmp_path / "build"), workers=1, strict=True))[0]
+    assert relaxed["warnings"] and not relaxed["errors"]
+    assert strict["status"] == "invalid" and strict["errors"] == relaxed["warnings"]
+
+
+def test_empty_source_fails(tmp_path, capsys):
+    assert main([str(tmp_path), "--output", str(tmp_path / "build")]) == 1
+    assert "No grammars found" in capsys.readouterr().err
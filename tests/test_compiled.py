@@ -0,0 +1,60 @@
+import random
+
+import pytest
+
+import bench
+from grammars import EXPR, grammar_id, ll1_grammars, token_lists
+from toc import Grammar, PredictiveParser, Tracer
+
+
+def stepped(grammar):
+    """A parser whose tracer takes steps, so parse() walks the table instead of the compiled engine"""
+    return PredictiveParser(grammar, Tracer(on_match=lambda token: None))
+
+
+@pytest.mark.parametrize("grammar", ll1_grammars(), ids=grammar_id)
+def test_compiled_parser_matches_interpretive_parser(grammar):
+    rng = random.Random(1)
+    for tokens in token_lists(grammar, rng):
+        interpretive = stepped(grammar)
+        compiled = PredictiveParser(grammar)
+        expected = interpretive.parse(list(tokens))
+        assert compiled.parse_compiled(tokens) == expected, tokens
+        assert compiled.input_string == interpretive.input_string, tokens
+        assert compiled.stack == [symbol for symbol in interpretive.stack if symbol != 'ε'], tokens
+
+        untraced = PredictiveParser(grammar)
+        assert untraced.parse(list(tokens)) == expected, tokens
+        assert (untraced.stack, untraced.input_string) == (compiled.stack, compiled.input_string), tokens
+
+
+def test_parse_reports_steps_and_keeps_the_input():
+    grammar = Grammar(EXPR)
+    steps = []
+    tracer = Tracer(on_expand=lambda top, production, token: steps.append((top, token)),
+                    on_match=steps.append, on_error=steps.append)
+    tokens = ["i", "+", "*"]
+    assert PredictiveParser(grammar, tracer).parse(tokens) == "\nError: No production for T with input '*'"
+    assert tokens == ["i", "+", "*"]
+    assert steps == [("E", "i"), ("T", "i"), ("F", "i"), "i", ("T'", "+"), ("E'", "+"), "+",
+                     "\nError: No production for T with input '*'"]
+
+
+@pytest.mark.parametrize("grammar", ll1_grammars(20, seed=2), ids=grammar_id)
+def test_packed_table_matches_parse_table(grammar):
+    compiled = grammar.compile()
+    ids = {name: index for index, name in enumerate(compiled.symbols)}
+    for lhs in grammar.productions:
+        row = grammar.parse_table.get(lhs, {})
+        for terminal, terminal_id in compiled.terminal_ids.items():
+            rule = compiled.lookup(ids[lhs], terminal_id)
+            expected = row.get(terminal)
+            assert (compiled.rules[rule] if rule >= 0 else None) == expected, (lhs, terminal)
+
+
+def test_packed_table_is_smaller_than_the_dense_table():
+    grammar = Grammar(bench.generate_grammar(60, 3, 0.3, 3, 7))
+    compiled = grammar.compile()
+    non_terminals = len(compiled.symbols) - compiled.n_terminals
+    assert len(compiled.value) == len(compiled.check) < non_terminals * compiled.width
+    assert len(compiled.value) >= sum(len(row) for row in grammar.parse_table.values())
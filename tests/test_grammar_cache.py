@@ -0,0 +1,53 @@
+import os
+import pickle
+
+from grammar_cache import GrammarCache, analyze
+from grammars import EXPR
+
+
+def test_store_load_and_evict(tmp_path):
+    cache = GrammarCache(str(tmp_path), max_entries=2)
+    built = []
+
+    def build(text):
+        built.append(text)
+        return analyze(text)
+
+    grammar = cache.get(EXPR, build)
+    again = cache.get("  " + EXPR.replace(";", " ;\n"), build)  # same grammar after normalization
+    assert built == [EXPR]
+    assert again.productions == grammar.productions
+    assert again.parse_table == grammar.parse_table
+    assert again.compile().run(["i", "*", "i"])[0] == "Input parsed successfully."
+
+    cache.get("S -> a", build)
+    os.utime(cache.path(cache.key(EXPR)), (0, 0))  # EXPR is now the least recently used entry
+    cache.get("S -> b", build)
+    assert len(cache.entries()) == 2
+    assert cache.load(EXPR) is None
+    assert cache.load("S -> b") is not None
+
+
+def test_variants_and_productions_have_their_own_entries(tmp_path):
+    cache = GrammarCache(str(tmp_path))
+    cache.store("S -> a", "plain")
+    cache.store("S -> a", "variant", variant="common_prefixes")
+    cache.store({"S": [["a"]]}, "mapping")
+    assert [cache.load("S -> a"), cache.load("S -> a", "common_prefixes"), cache.load({"S": [["a"]]})] == \
+        ["plain", "variant", "mapping"]
+
+
+class Broken:
+    def __reduce__(self):
+        return int, ("not a number",)  # raises ValueError when unpickled
+
+
+def test_stale_entries_are_removed_and_rebuilt(tmp_path):
+    cache = GrammarCache(str(tmp_path))
+    for payload in (pickle.dumps(Broken()), b"\x80\x05truncated", pickle.dumps(Broken())[:-1]):
+        with open(cache.path(cache.key(EXPR)), "wb") as f:
+            f.write(payload)
+        assert cache.load(EXPR) is None
+        assert not os.path.exists(cache.path(cache.key(EXPR)))
+    assert cache.get(EXPR).productions == analyze(EXPR).productions
+    assert cache.load(EXPR) is not None
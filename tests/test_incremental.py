@@ -0,0 +1,51 @@
+import random
+
+from incremental import GrammarEditor
+from toc import Grammar
+
+NAMES = [f"N{i}" for i in range(6)]
+TERMINALS = ['a', 'b', 'c', 'ε', ')']
+
+
+def random_rule(rng):
+    return [rng.choice(NAMES + TERMINALS) for _ in range(rng.randint(1, 4))]
+
+
+def rebuilt(grammar):
+    """The edited grammar analyzed from scratch, with the same start symbol"""
+    order = [grammar.start_symbol] + [lhs for lhs in grammar.productions if lhs != grammar.start_symbol]
+    return Grammar({lhs: [list(rule) for rule in grammar.productions[lhs]] for lhs in order}, skip_validation=True)
+
+
+def test_edits_match_full_rebuild():
+    rng = random.Random(11)
+    checked = 0
+    for _ in range(120):
+        productions = {name: [random_rule(rng) for _ in range(rng.randint(1, 3))]
+                       for name in NAMES[:rng.randint(2, 5)]}
+        grammar = Grammar(productions, skip_validation=True)
+        editor = GrammarEditor(grammar)
+        for _ in range(12):
+            lhs = rng.choice(NAMES)
+            op = rng.random()
+            try:
+                if op < 0.45:
+                    editor.add(lhs, random_rule(rng))
+                elif lhs not in grammar.productions:
+                    continue
+                elif op < 0.75:
+                    editor.remove(lhs, rng.choice(grammar.productions[lhs]))
+                else:
+                    editor.replace(lhs, rng.choice(grammar.productions[lhs]), random_rule(rng))
+            except ValueError as e:
+                assert "start symbol" in str(e)
+                continue
+            fresh = rebuilt(grammar)
+            assert grammar.first == fresh.first
+            assert grammar.follow == fresh.follow
+            assert grammar.terminals == fresh.terminals
+            assert grammar.parse_table == fresh.parse_table
+            assert grammar.conflicts == fresh.conflicts
+            assert grammar.predictive_table == fresh.predictive_table
+            checked += 1
+    assert checked > 500
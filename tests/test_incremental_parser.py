@@ -0,0 +1,46 @@
+import random
+
+import pytest
+
+import bench
+from grammars import EXPR
+from toc import Grammar, IncrementalParser, PredictiveParser
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_incremental_parser_matches_fresh_parse(seed):
+    rng = random.Random(seed)
+    grammar = Grammar(bench.generate_grammar(15, 3, 0.3, 3, seed) if seed else EXPR)
+    alphabet = sorted(grammar.terminals - {'ε', '$'} | {'?'})
+    corpus = [list(sentence) for sentence in bench.generate_sentences(grammar, 600, 60, seed)] or [[]]
+    for _ in range(20):
+        parser = IncrementalParser(grammar, interval=rng.choice([1, 2, 5, 16]))
+        parser.parse(list(rng.choice(corpus)))
+        for _ in range(15):
+            n = len(parser.tokens)
+            start = rng.randint(0, n)
+            end = rng.randint(start, min(n, start + 3))
+            new = [rng.choice(alphabet) for _ in range(rng.randint(0, 3))]
+            result = parser.edit(start, end, new)
+            fresh = PredictiveParser(grammar)
+            assert result == fresh.parse_compiled(parser.tokens), (parser.tokens, start, end, new)
+            assert [grammar.compiled.symbols[symbol] for symbol in parser.stack] == fresh.stack
+
+
+def test_edits_reparse_only_near_the_edit():
+    grammar = Grammar(EXPR)
+    tokens = ["i", "+"] * 20000 + ["i"]
+    parser = IncrementalParser(grammar, interval=64)
+    assert parser.parse(tokens) == "Input parsed successfully."
+    assert parser.reparsed == len(tokens)
+    assert parser.edit(20000, 20001, ["(", "i", ")"]) == "Input parsed successfully."  # an i
+    assert parser.reparsed <= 3 * 64
+    assert parser.edit(30003, 30004, ["*"]) == "Input parsed successfully."  # a +
+    assert parser.reparsed <= 3 * 64
+    assert parser.edit(4, 5, ["+"]) == PredictiveParser(grammar).parse(parser.tokens)  # an i
+    assert parser.result.startswith("\nError")
+    assert parser.reparsed <= 64
+    assert parser.edit(100, 101, ["*"]) == parser.result  # past the error: nothing to parse
+    assert parser.reparsed == 0
+    with pytest.raises(IndexError):
+        parser.edit(5, 2, [])
@@ -0,0 +1,50 @@
+import pytest
+
+from grammars import EXPR
+from lexer import LexError, Lexer
+from toc import Grammar, PredictiveParser
+
+
+def scan(lexer, text):
+    return [(terminal, text[start:end]) for terminal, start, end in lexer.scan(text)]
+
+
+def test_keywords_win_ties_and_identifiers_win_longer_matches():
+    lexer = Lexer(["if", "then", "="], {"id": r"[a-z]\w*"})
+    assert scan(lexer, "if iffy then x=then1") == [
+        ("if", "if"), ("id", "iffy"), ("then", "then"), ("id", "x"), ("=", "="), ("id", "then1")]
+
+
+def test_longest_class_match_wins():
+    lexer = Lexer(["+"], {"num": r"\d+", "float": r"\d+\.\d+"})
+    assert scan(lexer, "1.5+2") == [("float", "1.5"), ("+", "+"), ("num", "2")]
+    tie = Lexer([], {"first": r"[a-z]+", "second": r"[a-z]+"})
+    assert list(tie.tokens("abc")) == ["first"]
+
+
+def test_empty_matches_are_not_tokens():
+    with pytest.raises(ValueError, match="Empty terminal"):
+        Lexer(["", "a"])
+    lexer = Lexer(["a"], {"digits": r"\d*"})
+    assert list(lexer.tokens("a 12")) == ["a", "digits"]
+    with pytest.raises(LexError) as error:
+        list(lexer.tokens("a\n b?"))
+    assert (error.value.line, error.value.column, error.value.offset) == (2, 2, 3)
+
+
+def test_longest_literal_wins():
+    assert list(Lexer(["<", "<=", "<<", "="]).tokens("<<=<= <")) == ["<<", "=", "<=", "<"]
+
+
+def test_scan_file_matches_scan(tmp_path):
+    grammar = Grammar(EXPR)
+    text = "i + ( i * i )\n* i\n"
+    path = tmp_path / "input.txt"
+    path.write_bytes(text.encode("utf-8"))
+    lexer = Lexer.from_grammar(grammar)
+    assert list(lexer.scan_file(path)) == list(lexer.scan(text))
+    assert list(lexer.tokens_file(path)) == list(lexer.tokens(text.encode("utf-8")))
+    empty = tmp_path / "empty.txt"
+    empty.write_bytes(b"")
+    assert list(lexer.scan_file(empty)) == []
+    assert PredictiveParser(grammar).parse_stream(lexer.tokens_file(path)) == "Input parsed successfully."
@@ -0,0 +1,57 @@
+import pytest
+
+from grammars import EXPR
+from loader import GrammarSyntaxError, load_grammar, read_file, read_productions
+from toc import Grammar
+
+EXPR_FILE = """\
+# The expression grammar of the README, spread over several lines
+E  -> T E'
+E' -> '+' T E' | ε ;       // quoted terminals, optional ';'
+T ::= F T'
+T' -> "*" F T'
+    |
+F -> i | '(' E ')'
+"""
+
+
+def test_loader_syntax_reads_like_the_grammar_string():
+    assert read_productions(EXPR_FILE.splitlines(keepends=True)) == Grammar(EXPR).productions
+
+
+def test_repeated_definitions_merge_and_symbols_are_interned():
+    productions = read_productions(["S -> a B | a B\n", "B -> b\n", "S -> c | a B\n", "B ::= 'b' | 'a b'\n"])
+    assert productions == {"S": [["a", "B"], ["c"]], "B": [["b"], ["a b"]]}
+    names = read_productions(["Start -> word Tail\n", "Tail -> word | Start\n"])
+    assert names["Start"][0][0] is names["Tail"][0][0]
+    assert names["Tail"][1][0] is next(iter(names))
+
+
+@pytest.mark.parametrize("use_mmap", [False, True])
+def test_read_file(tmp_path, use_mmap):
+    path = tmp_path / "expr.grammar"
+    path.write_text(EXPR_FILE, encoding="utf-8")
+    assert read_file(path, use_mmap) == Grammar(EXPR).productions
+    assert load_grammar(path, use_mmap).compile().run(["i", "*", "(", "i", ")"])[0] == "Input parsed successfully."
+    empty = tmp_path / "empty.grammar"
+    empty.write_text("", encoding="utf-8")
+    with pytest.raises(GrammarSyntaxError, match="No productions at line 1"):
+        read_file(empty, use_mmap)
+
+
+@pytest.mark.parametrize("text, message, line, column", [
+    ("S -> '' a", "Empty quoted terminal", 1, 6),
+    ('S -> a\nA -> b ""', "Empty quoted terminal", 2, 8),
+    ("S -> 'a", "Unterminated quoted terminal", 1, 6),
+    ("S -> a;\n| b", "'|' outside a definition", 2, 1),
+    ("a b -> c", "Expected a single non-terminal before '->'", 1, 1),
+    ("-> a", "Expected a non-terminal before '->'", 1, 1),
+    ("S -> a; b c", "Expected '->' or '::='", 1, 9),
+    ("S -> 'S'", "Quoted terminal 'S' is also a non-terminal", 1, 6),
+    ("S -> ;", "Empty production for S", 1, 6),
+])
+def test_syntax_errors_carry_line_and_column(text, message, line, column):
+    with pytest.raises(GrammarSyntaxError) as error:
+        read_productions(text.splitlines(keepends=True))
+    assert str(error.value).startswith(message)
+    assert (error.value.line, error.value.column) == (line, column)
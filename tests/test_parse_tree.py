@@ -0,0 +1,62 @@
+import random
+
+import pytest
+
+from grammars import EXPR, grammar_id, ll1_grammars, token_lists
+from toc import Grammar, PredictiveParser, Tracer
+
+
+def leaves(tree, index=0):
+    children = tree.children(index)
+    if not children:
+        return [index]
+    return [leaf for child in children for leaf in leaves(tree, child)]
+
+
+@pytest.mark.parametrize("grammar", ll1_grammars(), ids=grammar_id)
+def test_tree_parse_matches_compiled_parse(grammar):
+    rng = random.Random(1)
+    for tokens in token_lists(grammar, rng):
+        expected = PredictiveParser(grammar)
+        result = expected.parse_compiled(tokens)
+        parser = PredictiveParser(grammar)
+        assert parser.parse_compiled(tokens, build_tree=True) == result, tokens
+        assert (parser.stack, parser.input_string) == (expected.stack, expected.input_string), tokens
+        tree = parser.tree
+        if result == "Input parsed successfully.":
+            consumed = len(tokens) + 1 - len(parser.input_string)  # a '$' token ends the input early
+            terminals = [tree.label(leaf) for leaf in leaves(tree) if tree.label(leaf) not in grammar.productions]
+            assert terminals == tokens[:consumed], tokens
+            assert tree.node().span == (0, consumed), tokens
+        for index in range(1, len(tree)):
+            up = tree.parent[index]
+            assert up < index and index in tree.children(up)
+            assert tree.start[up] <= tree.start[index] <= tree.end[index] <= tree.end[up]
+
+
+def test_tree_nodes_and_dot():
+    parser = PredictiveParser(Grammar(EXPR))
+    tokens = ["i", "*", "(", "i", ")"]
+    parser.parse_compiled(tokens, build_tree=True)
+    root = parser.tree.node()
+    assert [child.symbol for child in root.children] == ["T", "E'"]
+    term = root.children[0]
+    assert term.span == (0, 5) and term.text == tokens
+    assert [(child.symbol, child.span) for child in term.children] == [("F", (0, 1)), ("T'", (1, 5))]
+    assert term.children[1].parent.symbol == "T"
+    dot = parser.tree.to_dot(max_nodes=3)
+    assert dot.splitlines()[1:3] == ['  0 [label="E"];', '  1 [label="T"];']
+    assert "0 -> 1;" in dot and "-> 3;" not in dot
+
+
+def test_tree_parse_reports_the_same_steps_as_the_traced_parse():
+    grammar = Grammar(EXPR)
+    for tokens in (["(", "i", "+", "i", ")", "*", "i"], ["i", "+", "*"], ["i", ")"]):
+        runs = []
+        for build_tree in (False, True):
+            steps = []
+            tracer = Tracer(on_expand=lambda top, production, token: steps.append((top, tuple(production), token)),
+                            on_match=steps.append, on_error=steps.append)
+            result = PredictiveParser(grammar, tracer).parse_compiled(tokens, build_tree=build_tree)
+            runs.append((result, steps))
+        assert runs[0] == runs[1]
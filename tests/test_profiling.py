@@ -0,0 +1,54 @@
+import json
+
+from grammars import EXPR
+from profiling import ParseStats
+from toc import Grammar, PredictiveParser, Tracer
+
+TOKENS = "( i + i ) * i + i".split()
+
+
+def counters(stats):
+    data = stats.to_dict()
+    del data["phases"]
+    return data
+
+
+def test_compiled_and_table_walking_parses_count_the_same():
+    compiled, walked = ParseStats(), ParseStats()
+    grammar = Grammar(EXPR)
+    PredictiveParser(grammar, stats=compiled).parse(TOKENS)
+    PredictiveParser(grammar, Tracer(on_match=lambda token: None), walked).parse(TOKENS)
+    assert counters(compiled) == counters(walked)
+    data = counters(compiled)
+    assert (data["parses"], data["tokens"]) == (1, 9)
+    assert data["expansions"]["F"] == 5
+    assert data["epsilon_expansions"] == {"T'": 4, "E'": 2}
+    assert {"non_terminal": "F", "terminal": "(", "production": "( E )", "hits": 1} in data["cells"]
+    assert data["max_stack_depth"] == 6 and data["max_epsilon_chain"] == 2
+
+
+def test_phases_are_timed_only_with_stats(tmp_path):
+    stats = ParseStats()
+    grammar = Grammar(EXPR, stats=stats)
+    grammar.compile()
+    PredictiveParser(grammar).parse_compiled(TOKENS)
+    assert {"validate_grammar", "compute_sets", "compile", "parse_compiled"} <= set(stats.phases)
+    assert stats.phases["parse_compiled"][0] == 1
+    path = tmp_path / "stats.json"
+    assert json.loads(stats.to_json(path)) == json.loads(path.read_text(encoding="utf-8"))
+    stats.reset()
+    assert counters(stats)["parses"] == 0 and stats.phases == {}
+
+    plain = Grammar(EXPR)
+    assert plain.stats is None
+    assert PredictiveParser(plain).parse(TOKENS) == "Input parsed successfully."
+
+
+def test_tree_parse_counts_like_the_compiled_parse():
+    grammar = Grammar(EXPR)
+    compiled, tree = ParseStats(), ParseStats()
+    PredictiveParser(grammar, stats=compiled).parse_compiled(TOKENS)
+    traced = PredictiveParser(grammar, Tracer(on_match=lambda token: None), tree)  # as in the Streamlit parse tab
+    traced.parse_compiled(TOKENS, build_tree=True)
+    assert counters(tree) == counters(compiled)
+    assert counters(tree)["max_stack_depth"] > 0 and counters(tree)["max_epsilon_chain"] > 0
@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+from grammar_cache import GrammarCache
+from grammars import EXPR
+from service import Client, ParsingService, register_files
+from toc import Grammar, PredictiveParser
+
+OK = "Input parsed successfully."
+
+
+def expected(tokens, text=EXPR):
+    return PredictiveParser(Grammar(text)).parse(tokens)
+
+
+def serve(tmp_path, workers, scenario, **options):
+    """Runs scenario(client) against a service listening on a Unix socket"""
+    async def main():
+        service = ParsingService(workers, **options)
+        socket = str(tmp_path / "service.sock")
+        server = await service.start(unix_path=socket)
+        client = Client(unix_path=socket)
+        try:
+            async with server:
+                await scenario(client)
+        finally:
+            await client.close()
+            service.close()
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_register_parse_and_delete(tmp_path, workers):
+    async def scenario(client):
+        assert await client.register("expr", EXPR) == (200, {"name": "expr", "non_terminals": 5, "terminals": 7})
+        assert await client.request("GET", "/grammars") == (200, {"grammars": ["expr"]})
+        for tokens in (["i", "+", "i"], ["i", "+"], ["i", "i"], [")"]):
+            assert await client.parse("expr", tokens) == (200, {"result": expected(tokens)})
+        status, body = await client.request("POST", "/parse", {"grammar": "expr", "text": "( i * i ) + i"})
+        assert (status, body) == (200, {"result": OK})
+        status, body = await client.request("POST", "/parse", {"grammar": "expr", "text": "i ? i"})
+        assert status == 200 and body["result"].startswith("\nError: Unexpected character '?'")
+
+        inputs = [["i", "+"] * n + ["i"] * (n % 3 != 0) for n in range(40)]
+        status, body = await client.request("POST", "/parse", {"grammar": "expr", "inputs": inputs})
+        assert (status, body) == (200, {"results": [expected(tokens) for tokens in inputs]})
+
+        # Concurrent clients share batches
+        inputs = [["(", "i", ")"] * n for n in range(1, 6)]
+        clients = [Client(unix_path=client.unix_path) for _ in inputs]
+        try:
+            replies = await asyncio.gather(*(other.parse("expr", tokens) for other, tokens in zip(clients, inputs)))
+        finally:
+            for other in clients:
+                await other.close()
+        assert replies == [(200, {"result": expected(tokens)}) for tokens in inputs]
+
+        assert await client.request("DELETE", "/grammars/expr") == (200, {"deleted": "expr"})
+        assert (await client.parse("expr", ["i"]))[0] == 404
+        # A re-registered name is parsed with the new grammar, also by workers that had the old one
+        await client.register("expr", "E -> a")
+        assert await client.parse("expr", ["a"]) == (200, {"result": OK})
+        assert await client.parse("expr", ["i"]) == (200, {"result": expected(["i"], "E -> a")})
+    serve(tmp_path, workers, scenario, batch_delay=0.01, max_batch=8)
+
+
+def test_rejected_requests(tmp_path):
+    async def scenario(client):
+        status, body = await client.register("left", "E -> i | E + i")
+        assert status == 400
+        assert body["error"] == "Grammar is not LL(1): E on 'i': i | E + i"
+        status, body = await client.register("loop", "S -> a | B; B -> ε B")
+        assert (status, body) == (400, {"error": "Non-terminals derive no terminal string: B"})
+        assert await client.request("GET", "/grammars") == (200, {"grammars": []})
+
+        await client.register("expr", EXPR)
+        for path, payload in [("/parse", {"grammar": "expr", "tokens": "i + i"}),
+                              ("/parse", {"grammar": "expr", "tokens": ["i", 1]}),
+                              ("/parse", {"grammar": "expr", "inputs": [["i"], "i"]}),
+                              ("/parse", {"grammar": "expr", "inputs": "i"}),
+                              ("/parse", {"grammar": "expr", "text": 3}),
+                              ("/parse", {"grammar": "expr"}),
+                              ("/grammars", {"name": "x"})]:
+            status, body = await client.request("POST", path, payload)
+            assert status == 400, (payload, body)
+        assert await client.request("POST", "/parse", [1, 2]) == (400, {"error": "Expected a JSON object"})
+        assert (await client.request("POST", "/parse", {"grammar": "nope", "tokens": []}))[0] == 404
+        assert (await client.request("PUT", "/grammars"))[0] == 404
+        assert await client.parse("expr", ["i"]) == (200, {"result": OK})  # the connection is still usable
+    serve(tmp_path, 0, scenario)
+
+
+def test_grammar_files_use_the_loader_syntax_and_the_cache(tmp_path):
+    path = tmp_path / "expr.grammar"
+    path.write_text("# expressions\nE ::= T E'\nE' -> '+' T E' |\nT -> 'i' | '(' E ')'\n", encoding="utf-8")
+    cache = GrammarCache(str(tmp_path / "cache"))
+
+    async def main():
+        for _ in range(2):
+            service = ParsingService(cache=cache)
+            await register_files(service, [f"expr={path}"])
+            assert await service.parse("expr", ["(", "i", "+", "i", ")"]) == OK
+        with pytest.raises(SystemExit, match="missing.grammar"):
+            await register_files(service, [f"x={tmp_path / 'missing.grammar'}"])
+    asyncio.run(main())
+    assert len(cache.entries()) == 1
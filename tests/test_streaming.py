@@ -0,0 +1,33 @@
+import random
+
+import pytest
+
+from grammars import EXPR, grammar_id, ll1_grammars, token_lists
+from toc import Grammar, PredictiveParser, StreamingParser
+
+
+@pytest.mark.parametrize("grammar", ll1_grammars(), ids=grammar_id)
+def test_streaming_parser_matches_compiled_parser(grammar):
+    rng = random.Random(1)
+    for tokens in token_lists(grammar, rng):
+        compiled = PredictiveParser(grammar)
+        expected = compiled.parse_compiled(tokens)
+        stream = StreamingParser(grammar)
+        for token in tokens:
+            stream.feed([token])
+        assert stream.finish() == expected, tokens
+        assert PredictiveParser(grammar).parse_stream(iter(tokens)) == expected, tokens
+
+
+def test_stream_stops_reading_at_the_first_error():
+    read = []
+
+    def tokens():
+        for token in ["i", "+", "+", "i", "i"]:
+            read.append(token)
+            yield token
+
+    parser = PredictiveParser(Grammar(EXPR))
+    assert parser.parse_stream(tokens()) == "\nError: No production for T with input '+'"
+    assert read == ["i", "+", "+"]
+    assert parser.stack == ["E'"]
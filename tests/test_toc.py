@@ -0,0 +1,51 @@
+import random
+
+import pytest
+
+from grammars import EXPR, ll1_grammars, token_lists
+from toc import Grammar, PredictiveParser, StreamingParser
+
+
+def test_nullable_alternatives_conflict_on_follow_terminals():
+    grammar = Grammar("S -> A b | c; A -> ε | B; B -> d | ε", skip_validation=True)
+    assert {(conflict.lhs, conflict.terminal) for conflict in grammar.conflicts} == {('A', 'b')}
+
+
+def test_recovery_reports_an_emptied_stack_once():
+    grammar = Grammar(EXPR)
+    errors = PredictiveParser(grammar).parse_all(") ) ) i + + i ( ( *".split())
+    assert [position for position, _ in errors] == [0, 5, 7, 10]
+    rng = random.Random(4)
+    for grammar in ll1_grammars(15, seed=4):
+        for tokens in token_lists(grammar, rng, count=60):
+            errors = PredictiveParser(grammar).parse_all(tokens)
+            for (before, _), (position, message) in zip(errors, errors[1:]):
+                assert not (message == "Input not fully consumed." and position == before), (tokens, errors)
+
+
+
+def test_parse_file_resets_state_on_lex_error(tmp_path):
+    grammar = Grammar(EXPR)
+    parser = PredictiveParser(grammar)
+    earlier, bad = tmp_path / "earlier.txt", tmp_path / "bad.txt"
+    earlier.write_text("( ( i")
+    bad.write_text("i + ?")
+    parser.parse_file(earlier)
+    assert parser.parse_file(bad).startswith("\nError: Unexpected character '?'")
+    reference = StreamingParser(grammar)
+    reference.feed(["i", "+"])
+    assert parser.stack == reference.stack_symbols()
+    assert parser.input_string == []
+
+
+def test_left_recursion_removal_drops_epsilon_from_alpha():
+    grammar = Grammar("S -> S ε a | b", skip_validation=True)
+    grammar.remove_left_recursion()
+    assert grammar.productions == {"S": [["b", "S'"]], "S'": [["a", "S'"], ["ε"]]}
+
+
+def test_left_recursion_removal_rejects_only_recursive_alternatives():
+    grammar = Grammar("S -> a A; A -> A b | A c", skip_validation=True)
+    with pytest.raises(ValueError, match="A derives no terminal string"):
+        grammar.remove_left_recursion()
+    assert grammar.productions == {"S": [["a", "A"]], "A": [["A", "b"], ["A", "c"]]}
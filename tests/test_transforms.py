@@ -0,0 +1,103 @@
+import random
+
+import pytest
+
+from grammars import random_productions
+from toc import Grammar
+
+
+def alternatives(productions, lhs, fresh):
+    """Alternatives of lhs with the non-terminals in `fresh` expanded away and ε dropped"""
+    result = set()
+    for rule in productions[lhs]:
+        expanded = [()]
+        for symbol in rule:
+            if symbol in fresh:
+                expanded = [done + tail for done in expanded for tail in alternatives(productions, symbol, fresh)]
+            elif symbol != 'ε':
+                expanded = [done + (symbol,) for done in expanded]
+        result.update(expanded)
+    return result
+
+
+def test_common_prefixes_become_fresh_non_terminals():
+    grammar = Grammar("S -> a b c | a b d | a | e | a b c; S' -> S'' x; S'' -> y", skip_validation=True)
+    grammar.remove_common_prefixes()
+    assert grammar.productions == {
+        "S": [["a", "S'''"], ["e"]], "S'''": [["b", "S''''"], ["ε"]], "S''''": [["c"], ["d"]],
+        "S'": [["S''", "x"]], "S''": [["y"]],
+    }
+    assert grammar.non_terminals == set(grammar.productions)
+
+
+def test_left_factoring_keeps_every_alternative():
+    rng = random.Random(13)
+    for _ in range(300):
+        productions = random_productions(rng, rng.randint(1, 4), terminals="ab")
+        grammar = Grammar({lhs: [list(rule) for rule in rules] for lhs, rules in productions.items()},
+                          skip_validation=True)
+        grammar.remove_common_prefixes()
+        fresh = set(grammar.productions) - set(productions)
+        for lhs, rules in grammar.productions.items():
+            firsts = [rule[0] for rule in rules]
+            assert len(firsts) == len(set(firsts)), (productions, lhs, rules)
+        for lhs, rules in productions.items():
+            expected = {tuple(symbol for symbol in rule if symbol != 'ε') for rule in rules}
+            assert alternatives(grammar.productions, lhs, fresh) == expected, productions
+
+
+def naive_useless_symbols(productions, start):
+    """Fixpoint definitions of unproductive and (after dropping their rules) unreachable non-terminals"""
+    productive = set()
+    changed = True
+    while changed:
+        changed = False
+        for lhs, rules in productions.items():
+            if lhs not in productive and any(all(sym in productive or sym not in productions for sym in rule)
+                                             for rule in rules):
+                productive.add(lhs)
+                changed = True
+    reachable = {start}
+    changed = True
+    while changed:
+        changed = False
+        for lhs in list(reachable):
+            for rule in productions.get(lhs, ()):
+                if all(sym in productive or sym not in productions for sym in rule):
+                    for sym in rule:
+                        if sym in productions and sym not in reachable:
+                            reachable.add(sym)
+                            changed = True
+    unproductive = set(productions) - productive
+    return unproductive, set(productions) - unproductive - reachable
+
+
+def test_useless_symbols_match_fixpoint_definitions():
+    rng = random.Random(22)
+    for _ in range(400):
+        productions = random_productions(rng, rng.randint(1, 6), terminals="ab")
+        grammar = Grammar({lhs: [list(rule) for rule in rules] for lhs, rules in productions.items()},
+                          skip_validation=True)
+        unproductive, unreachable = naive_useless_symbols(productions, grammar.start_symbol)
+        report = grammar.remove_useless_symbols(remove=False)
+        assert (report.unproductive, report.unreachable, report.removed_rules) == (unproductive, unreachable, [])
+        assert grammar.productions == productions
+        if grammar.start_symbol in unproductive:
+            continue
+        report = grammar.remove_useless_symbols()
+        assert set(grammar.productions) == set(productions) - unproductive - unreachable
+        for lhs, rules in grammar.productions.items():
+            assert all(sym not in unproductive for rule in rules for sym in rule)
+            assert [rule for rule in productions[lhs] if rule in rules] == rules
+        kept = sum(len(rules) for rules in grammar.productions.values())
+        assert kept + len(report.removed_rules) == sum(len(rules) for rules in productions.values())
+
+
+def test_useless_symbol_removal_updates_terminals():
+    grammar = Grammar("S -> a B | c; B -> B b; C -> d", skip_validation=True)
+    report = grammar.remove_useless_symbols()
+    assert (report.unproductive, report.unreachable) == ({"B"}, {"C"})
+    assert grammar.productions == {"S": [["c"]]}
+    assert grammar.terminals - {'$', 'ε'} == {"c"}
+    with pytest.raises(ValueError, match="Start symbol S derives no terminal string"):
+        Grammar("S -> S a", skip_validation=True).remove_useless_symbols()
@@ -1,8 +1,86 @@
+import mmap
+from array import array
+from bisect import bisect_right
+from collections import namedtuple
+
+from analysis import SetAnalysis, strongly_connected_components, useless_symbols
+from lexer import LexError, Lexer, line_and_column
+from parse_tree import ParseTree
+from profiling import timed
+
+
+class Tracer:
+    """Destination for diagnostic output and per-step parse events.
+
+    `level` gates the analysis printouts: SILENT prints nothing, INFO prints
+    rules, sets and the predictive table, DEBUG also prints every parse step.
+    The on_expand(top, production, token), on_match(token), on_error(message)
+    and on_recover(token) callbacks receive parse steps at any level. Call
+    sites test `info`/`debug`/`steps` before formatting anything, so a
+    silent tracer without callbacks costs nothing.
+    """
+    SILENT = 0
+    INFO = 1
+    DEBUG = 2
+
+    def __init__(self, level=SILENT, on_expand=None, on_match=None, on_error=None, on_recover=None, output=print):
+        self.level = level
+        self.info = level >= self.INFO
+        self.debug = level >= self.DEBUG
+        self.on_expand = on_expand
+        self.on_match = on_match
+        self.on_error = on_error
+        self.on_recover = on_recover
+        self.output = output
+        self.steps = self.debug or any(callback is not None for callback in (on_expand, on_match, on_error, on_recover))
+
+    def log(self, *args, **kwargs):
+        self.output(*args, **kwargs)
+
+    def expand(self, top, production, token):
+        if self.debug:
+            self.output("\n>>Production found", production)
+        if self.on_expand is not None:
+            self.on_expand(top, production, token)
+
+    def match(self, token):
+        if self.debug:
+            self.output("\n>>Match found ", token)
+        if self.on_match is not None:
+            self.on_match(token)
+
+    def error(self, message):
+        if self.debug:
+            self.output(message)
+        if self.on_error is not None:
+            self.on_error(message)
+
+    def recover(self, token):
+        if self.debug:
+            self.output(f"Skipping: {token}")
+        if self.on_recover is not None:
+            self.on_recover(token)
+
+
+SILENT = Tracer()
+
+# A predictive table cell claimed by more than one production. kind is
+# "FIRST/FOLLOW" when a nullable production claims it through FOLLOW(lhs),
+# "FIRST/FIRST" when every claim comes from a FIRST set.
+Conflict = namedtuple("Conflict", "lhs terminal productions kind")
+
+# What remove_useless_symbols found: non-terminals deriving no terminal
+# string, non-terminals unreachable from the start symbol, and the
+# (lhs, rule) pairs dropped (empty when only reporting)
+UselessSymbols = namedtuple("UselessSymbols", "unproductive unreachable removed_rules")
+
+
 class GrammarValidationResult:
     def __init__(self):
         self.is_valid = True
         self.errors = []
         self.warnings = []
+        self.conflicts = []  # Conflict list from check_ll1_conditions
 
     def add_error(self, error):
         self.is_valid = False
@@ -12,25 +90,131 @@ class GrammarValidationResult:
         self.warnings.append(warning)
 
 class Grammar:
-    def __init__(self, productions , skip_validation=False):
-        self.productions = self.parse_productions(productions)
-        self.first = {}
-        self.follow = {}
-        self.predictive_table = {}
+    # Analysis stages are computed on first access and memoized in _stages.
+    # Replacing a stage drops every stage derived from it; the transformation
+    # methods invalidate "productions", which drops them all.
+    DEPENDENTS = {
+        "productions": ("first", "production_first"),
+        "first": ("follow", "production_first"),
+        "follow": ("parse_table",),
+        "production_first": ("parse_table",),
+        "parse_table": ("predictive_table", "compiled", "conflicts"),
+    }
+
+    def __init__(self, productions , skip_validation=False, tracer=None, stats=None):
+        self.tracer = tracer or SILENT
+        self.stats = stats  # optional profiling.ParseStats
+        self._stages = {}
+        if isinstance(productions, str):
+            self.productions = self.parse_productions(productions)
+        else:  # {lhs: [rule, ...]} as built by loader.read_productions, used as is
+            self.productions = dict(productions)
         self.start_symbol = list(self.productions.keys())[0]
         self.terminals = set()  # Set for terminals
         self.non_terminals = set(self.productions.keys())  # Set for non-terminals
 
+        # Determine terminals (the table built during validation needs them)
+        self.determine_terminals()
+
         # Grammar validation steps
         if not skip_validation:
             validation_result = self.validate_grammar()
             if not validation_result.is_valid:
                 raise ValueError("\n".join(validation_result.errors))
 
-        # Determine terminals
-        self.determine_terminals()
         self.print_terminals_and_non_terminals()
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['tracer']  # Runtime attachments; callbacks need not be picklable
+        state.pop('stats', None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.tracer = SILENT
+        self.stats = None
+
+    def invalidate(self, stage):
+        """Drops a memoized stage and everything derived from it"""
+        pending = [stage]
+        while pending:
+            stage = pending.pop()
+            self._stages.pop(stage, None)
+            pending.extend(self.DEPENDENTS.get(stage, ()))
+
+    def _set_stage(self, stage, value):
+        self.invalidate(stage)
+        self._stages[stage] = value
+
+    @property
+    def first(self):
+        if "first" not in self._stages:
+            self.compute_sets()
+        return self._stages["first"]
+
+    @first.setter
+    def first(self, value):
+        self._set_stage("first", value)
+
+    @property
+    def follow(self):
+        if "follow" not in self._stages:
+            self.compute_sets()
+        return self._stages["follow"]
+
+    @follow.setter
+    def follow(self, value):
+        self._set_stage("follow", value)
+
+    @property
+    def production_first(self):
+        """Memo of compute_first_for_production, keyed by the production as a tuple"""
+        return self._stages.setdefault("production_first", {})
+
+    @property
+    def parse_table(self):
+        """Sparse predictive table: {lhs: {terminal: production}} holding only the filled cells"""
+        if "parse_table" not in self._stages:
+            self.construct_predictive_table()
+        return self._stages["parse_table"]
+
+    @parse_table.setter
+    def parse_table(self, value):
+        self._set_stage("parse_table", value)
+
+    @property
+    def predictive_table(self):
+        """Dense view of parse_table with "nil" in every empty cell, built on demand for display"""
+        table = self.parse_table
+        if "predictive_table" not in self._stages:
+            dense = {}
+            for lhs, row in table.items():
+                dense[lhs] = dict.fromkeys(self.terminals, "nil")
+                dense[lhs].update(row)
+            self._stages["predictive_table"] = dense
+        return self._stages["predictive_table"]
+
+    @property
+    def compiled(self):
+        """CompiledGrammar for the current predictive table, once compile() has built it"""
+        return self._stages.get("compiled")
+
+    @compiled.setter
+    def compiled(self, value):
+        if value is None:
+            self.invalidate("compiled")
+        else:
+            self._set_stage("compiled", value)
+
+    @property
+    def conflicts(self):
+        """Set of Conflict for every predictive table cell claimed more than once"""
+        if "conflicts" not in self._stages:
+            self.construct_predictive_table()
+        return self._stages["conflicts"]
+
+    @timed("validate_grammar")
     def validate_grammar(self):
         """Validates if the grammar is suitable for LL(1) parsing"""
         result = GrammarValidationResult()
@@ -89,29 +273,13 @@ class Grammar:
         return result
 
     def check_ll1_conditions(self):
-        """Checks LL(1) conditions after computing FIRST and FOLLOW sets"""
-        # Compute FIRST and FOLLOW sets if not already computed
+        """Checks LL(1) conditions using the conflicts found while building the predictive table"""
         result = GrammarValidationResult()
-        
-        if not self.first:
-            self.compute_first()
-        if not self.follow:
-            self.compute_follow()
-
-        for lhs, rules in self.productions.items():
-            first_sets = []
-            for rule in rules:
-                first = self.compute_first_for_production(rule)
-                
-                for prev_first in first_sets:
-                    if first & prev_first:
-                        result.add_error(f"Grammar is not LL(1) - FIRST sets overlap for {lhs}")
-                first_sets.append(first)
-                
-                if 'ε' in first:
-                    follow = self.follow[lhs]
-                    if first & follow:
-                        result.add_error(f"Grammar is not LL(1) - FIRST/FOLLOW conflict for {lhs}")
+        result.conflicts = sorted(self.conflicts)
+        for conflict in result.conflicts:
+            alternatives = " | ".join(" ".join(production) for production in conflict.productions)
+            result.add_error(f"Grammar is not LL(1) - {conflict.kind} conflict for {conflict.lhs} "
+                             f"on '{conflict.terminal}': {alternatives}")
         return result
     
     def determine_terminals(self):
@@ -123,14 +291,18 @@ class Grammar:
         self.terminals.add('$')  # Add '$' explicitly
 
     def print_terminals_and_non_terminals(self):
-        print("Terminals:", self.terminals)
-        print("Non-terminals:", self.non_terminals)
+        if self.tracer.info:
+            self.tracer.log("Terminals:", self.terminals)
+            self.tracer.log("Non-terminals:", self.non_terminals)
         
+    @timed("parse_productions")
     def parse_productions(self, productions):
         rules = {}
+        log = self.tracer.log if self.tracer.info else None
         for production in productions.split(";"):
             production = production.strip()
-            print(production)
+            if log:
+                log(production)
             if "->" not in production:
                 continue
 
@@ -140,110 +312,198 @@ class Grammar:
 
             rules[lhs] = [r.strip().split() for r in rhs if r.strip()]
 
-        print("\nRules:")
-        for i in rules:
-            print(f"\tRule for {i}:")
-            for j, rule in enumerate(rules[i]):
-                print(f"\t  {j+1}. {i} -> {' '.join(rule)}")
-            print()
+        if log:
+            log("\nRules:")
+            for i in rules:
+                log(f"\tRule for {i}:")
+                for j, rule in enumerate(rules[i]):
+                    log(f"\t  {j+1}. {i} -> {' '.join(rule)}")
+                log()
         return rules
 
+    @timed("remove_left_recursion")
     def remove_left_recursion(self):
+        """Removes direct and indirect left recursion.
+
+        Left recursion can only run through a strongly connected component of
+        the "leftmost symbol" graph (A -> B when an alternative of A starts
+        with B), so the classic substitution algorithm is applied inside each
+        such component only, in grammar order, followed by direct-recursion
+        elimination: A -> A α | β becomes A -> β A', A' -> α A' | ε.
+        Non-terminals outside the component are never substituted.
+        Recursion hidden behind a nullable leftmost symbol is not detected.
+        Raises ValueError, leaving the grammar unchanged, when a non-terminal
+        has only left-recursive alternatives.
+        """
+        productions = {lhs: [list(rule) for rule in rules] for lhs, rules in self.productions.items()}
+        used = self.symbols()
+        leftmost = {lhs: {rule[0] for rule in rules if rule and rule[0] in productions}
+                    for lhs, rules in productions.items()}
+        added = {}  # lhs -> (A', rules), placed right after lhs
+
+        for component in strongly_connected_components(list(productions), leftmost):
+            if len(component) == 1 and component[0] not in leftmost[component[0]]:
+                continue  # Not left recursive
+            members = set(component)
+            order = [lhs for lhs in productions if lhs in members]
+            for i, lhs in enumerate(order):
+                # Substitute earlier members of the component at the left edge
+                for earlier in order[:i]:
+                    rules = []
+                    for rule in productions[lhs]:
+                        if rule and rule[0] == earlier:
+                            for delta in productions[earlier]:
+                                substituted = [sym for sym in delta if sym != 'ε'] + rule[1:]
+                                rules.append(substituted or ['ε'])
+                        else:
+                            rules.append(rule)
+                    productions[lhs] = rules
+
+                # Direct left recursion
+                alpha = [[sym for sym in rule[1:] if sym != 'ε'] for rule in productions[lhs] if rule and rule[0] == lhs]
+                if not alpha:
+                    continue
+                beta = [rule for rule in productions[lhs] if not (rule and rule[0] == lhs)]
+                if not beta:
+                    raise ValueError(f"{lhs} derives no terminal string: every alternative is left recursive")
+                new_non_terminal = self.new_non_terminal(lhs, used)
+                productions[lhs] = [[sym for sym in b if sym != 'ε'] + [new_non_terminal] for b in beta]
+                added[lhs] = (new_non_terminal, [a + [new_non_terminal] for a in alpha if a] + [['ε']])
+
         new_rules = {}
+        for lhs, rules in productions.items():
+            new_rules[lhs] = rules
+            if lhs in added:
+                new_non_terminal, new_non_terminal_rules = added[lhs]
+                new_rules[new_non_terminal] = new_non_terminal_rules
+        self.productions = new_rules
+        self.invalidate("productions")
     
+        # Print updated rules
+        if self.tracer.info:
+            self.tracer.log("\nRemoved Left Recursion New Rules:")
+            for lhs in self.productions:
+                rules = self.productions[lhs]
+                for rule in rules:
+                    self.tracer.log(f"\t{lhs} -> {' '.join(rule)}")
+        self.non_terminals = set(self.productions.keys())  # Update non-terminals
+        self.determine_terminals()  # Recalculate terminals
+        self.print_terminals_and_non_terminals()  # Print updated sets
+
+    @timed("remove_common_prefixes")
+    def remove_common_prefixes(self):
+        """Left-factors every non-terminal through a prefix trie of its alternatives.
+
+        Each maximal shared prefix becomes `prefix A'` with a fresh A' (more
+        primes if the name is taken) deriving the remaining suffixes, factored
+        again in turn. Every trie node is visited once, so the pass is linear
+        in the total length of the rules.
+        """
+        used = self.symbols()
+        new_rules = {}
         for lhs in self.productions:
-            rules = self.productions[lhs]
-            alpha = []
-            beta = []
-    
-            # Separate rules into alpha and beta
-            for rule in rules:
-                
-                if rule[0][0] == lhs:  # Check for left recursion
-                    #print("found",rule)
-                    a=rule[0][1:]
-                    #print("a=",a)
-                    alpha.append(a)  # Add to alpha if left recursive
-                    #print("alpha=",alpha)
-                   
-                else:
-                    beta.append(rule)  # Add to beta otherwise
+            # Trie of the alternatives; the None key marks the end of one
+            root = {}
+            for rule in self.productions[lhs]:
+                node = root
+                for symbol in rule:
+                    if symbol != 'ε':
+                        node = node.setdefault(symbol, {})
+                node[None] = True
+
+            pending = [(lhs, root)]
+            for symbol, node in pending:  # Grows while iterating
+                alternatives = []
+                for child, subtree in node.items():
+                    if child is None:
+                        alternatives.append(['ε'])
+                        continue
+                    prefix = [child]
+                    # Follow the path while it does not branch
+                    while len(subtree) == 1 and None not in subtree:
+                        child, subtree = next(iter(subtree.items()))
+                        prefix.append(child)
+                    if list(subtree) == [None]:
+                        alternatives.append(prefix)
+                    else:
+                        new_non_terminal = self.new_non_terminal(lhs, used)
+                        alternatives.append(prefix + [new_non_terminal])
+                        pending.append((new_non_terminal, subtree))
+                new_rules[symbol] = alternatives
     
-            # If left recursion exists
-            if alpha:
-                new_non_terminal = f"{lhs}'"
-                new_rules[lhs] = [b + [new_non_terminal] for b in beta]
-             
-                stri=""
-                for a in alpha:
-                    stri += f"{a}"
-              #  print("String:",stri)
-                stri+= f"{new_non_terminal}"
-                new_rules[new_non_terminal] =  [stri]+ [['ε']]
-            else:
-                new_rules[lhs] = rules  # No left recursion, keep original rules
-        
         self.productions = new_rules
-    
-        # Print updated rules
-        print("\nRemoved Left Recursion New Rules:")
+        self.invalidate("productions")
+        if self.tracer.info:
+            self.tracer.log("\nRemoved Common Prefixes New Rules:")
+            for lhs in self.productions:
+                rules = self.productions[lhs]
+                for rule in rules:
+                    self.tracer.log(f"\t{lhs} -> {' '.join(rule)}")
        
-        for lhs in self.productions:
-            rules = self.productions[lhs]
-            for rule in rules:
-                print(f"\t{lhs} -> {' '.join(rule)}")
         self.non_terminals = set(self.productions.keys())  # Update non-terminals
         self.determine_terminals()  # Recalculate terminals
         self.print_terminals_and_non_terminals()  # Print updated sets
 
+    @timed("remove_useless_symbols")
+    def remove_useless_symbols(self, remove=True):
+        """Finds (and by default removes) unproductive and unreachable non-terminals.
 
+        Rules mentioning an unproductive non-terminal go first, then every
+        non-terminal the start symbol can no longer reach. Terminals used only
+        by dropped rules leave the terminal set. Returns an UselessSymbols
+        report; with remove=False the grammar is left untouched.
+        """
+        unproductive, unreachable = useless_symbols(self.productions, self.start_symbol)
+        if not remove or not (unproductive or unreachable):
+            return UselessSymbols(unproductive, unreachable, [])
+        if self.start_symbol in unproductive:
+            raise ValueError(f"Start symbol {self.start_symbol} derives no terminal string")
 
-    def remove_common_prefixes(self):
         new_rules = {}
-        for lhs in self.productions:
-            rules = self.productions[lhs]
-            prefixes = {}
-            
-            
+        removed = []
+        for lhs, rules in self.productions.items():
+            if lhs in unproductive or lhs in unreachable:
+                removed.extend((lhs, rule) for rule in rules)
+                continue
+            kept = []
             for rule in rules:
-                prefix = tuple(rule)  # Convert the list to a tuple
-                if prefix not in prefixes:
-                    prefixes[prefix] = []
-                prefixes[prefix].append(rule)
-                
-            new_rules[lhs] = []
-    
-            for prefix, grouped_rules in prefixes.items():
-                if len(grouped_rules) > 1:
-                    new_non_terminal = f"{lhs}'"
-                    new_rules[lhs] = [list(prefix)]  # Common prefix rule
-                    new_rules[new_non_terminal] = [r[len(prefix):] for r in grouped_rules]
+                if any(sym in unproductive for sym in rule):
+                    removed.append((lhs, rule))
                 else:
-                    new_rules[lhs].append(grouped_rules[0])  # Keep original if no common prefix
-    
-        print("\nRemoved Common Prefixes New Rules:")
-        """for i in new_rules:
-            print(f"\tRule for {i}:")
-            for j, rule in enumerate(new_rules[i]):
-                print(f"\t  {j+1}. {i} -> {' '.join(rule)}")
-            print()"""
-        for lhs in self.productions:
-            rules = self.productions[lhs]
-            for rule in rules:
-                print(f"\t{lhs} -> {' '.join(rule)}")
-       
-            
+                    kept.append(rule)
+            new_rules[lhs] = kept
         self.productions = new_rules
+        self.invalidate("productions")
+        if self.tracer.info:
+            self.tracer.log("\nRemoved Useless Symbols:")
+            self.tracer.log("Unproductive:", unproductive)
+            self.tracer.log("Unreachable:", unreachable)
         self.non_terminals = set(self.productions.keys())  # Update non-terminals
+        self.terminals = set()
         self.determine_terminals()  # Recalculate terminals
         self.print_terminals_and_non_terminals()  # Print updated sets
+        return UselessSymbols(unproductive, unreachable, removed)
+
+    def symbols(self):
+        """Every symbol used by the grammar, on either side of a production"""
+        used = set(self.productions)
+        for rules in self.productions.values():
+            for rule in rules:
+                used.update(rule)
+        return used
+
+    def new_non_terminal(self, base, used):
+        """Fresh non-terminal name base', base'', ... not in `used` (which is updated)"""
+        name = f"{base}'"
+        while name in used:
+            name += "'"
+        used.add(name)
+        return name
 
 
+    @timed("compute_first")
     def compute_first(self):
-        print("FIRST of Nonterm:")
-        
-        for symbol in self.productions:
-            self.first[symbol] = set()  # Initialize the set for the non-terminal
+        self.first = {symbol: set() for symbol in self.productions}  # Initialize the set for each non-terminal
 
         changed = True
         while changed:
@@ -268,15 +528,16 @@ class Grammar:
                         changed = True
 
         # Print FIRST sets for debugging
-        for symbol in self.productions:
-            print(symbol, ":", self.first[symbol])
+        if self.tracer.info:
+            self.tracer.log("FIRST of Nonterm:")
+            for symbol in self.productions:
+                self.tracer.log(symbol, ":", self.first[symbol])
                 
 
    
+    @timed("compute_follow")
     def compute_follow(self):
-        print("\nFOLLOW of Nonterm:")
-        for symbol in self.productions:
-            self.follow[symbol] = set()  # Initialize empty FOLLOW set
+        self.follow = {symbol: set() for symbol in self.productions}  # Initialize empty FOLLOW sets
     
         # Add end marker ($) to the FOLLOW set of the start symbol
         self.follow[self.start_symbol].add('$')
@@ -319,134 +580,1007 @@ class Grammar:
                             self.follow[current_symbol].add(')')
     
         # Print FOLLOW sets for debugging
-        for symbol in self.productions:
-            print(symbol, ":", self.follow[symbol])
+        if self.tracer.info:
+            self.tracer.log("\nFOLLOW of Nonterm:")
+            for symbol in self.productions:
+                self.tracer.log(symbol, ":", self.follow[symbol])
             
         self.print_terminals_and_non_terminals()  # Print updated sets
 
 
+    @timed("compute_sets")
+    def compute_sets(self):
+        """Computes FIRST and FOLLOW with the bitset/worklist engine; same sets as compute_first + compute_follow"""
+        analysis = SetAnalysis(self.productions, self.start_symbol)
+        self.first = analysis.first_sets()
+        self.follow = analysis.follow_sets()
+        return analysis
+
     def compute_first_for_production(self, production): #for predictve table purpose
+        """FIRST of a right-hand side, memoized until the FIRST sets change; do not mutate the result"""
+        first = self.first  # before the memo: computing FIRST resets it
+        memo = self.production_first
+        key = tuple(production)
+        if key in memo:
+            return memo[key]
         first_set = set()
         for sym in production:
             if sym in self.productions:  # Non-terminal
-                first_set.update(self.first[sym])
-                if 'ε' not in self.first[sym]:
+                first_set.update(first[sym])
+                if 'ε' not in first[sym]:
                     break
             else:  # Terminal
                 first_set.add(sym)
                 break
         else:
             first_set.add('ε')  # If all symbols are nullable
+        memo[key] = first_set
         return first_set
     
+    @timed("construct_predictive_table")
     def construct_predictive_table(self):
-        print("Constructing Predictive Parsing Table:\n")
-        # Initialize the predictive table
-        self.predictive_table = {lhs: {terminal: "nil" for terminal in self.terminals} for lhs in self.productions}
-        
-    
-        for lhs in self.productions:
-            for production in self.productions[lhs]:
-                first_set = self.compute_first_for_production(production)  # Compute FIRST for the right-hand side
-                print(production, first_set)
-    
-                # Rule 1: Fill in the table using FIRST
-                for terminal in first_set:
-                    # if terminal != 'ε':  # Exclude ε
-                    self.predictive_table[lhs][terminal] = production
-    
-                # Rule 2: Handle ε in FIRST and fill with FOLLOW
-                if 'ε' in first_set:
-                    for terminal in self.follow[lhs]:
-                        self.predictive_table[lhs][terminal] = production
-                    
-                    # Include $ if it's in the FOLLOW set
-                    if '$' in self.follow[lhs]:
-                        self.predictive_table[lhs]['$'] = production
+        log = self.tracer.log if self.tracer.info else None
+        if log:
+            log("Constructing Predictive Parsing Table:\n")
+        conflicts = set()
+        self.parse_table = {lhs: self.construct_table_row(lhs, log, conflicts) for lhs in self.productions}
+        self._stages["conflicts"] = conflicts  # after the table: assigning it drops the old report
     
         # Formatted output of the predictive parsing table and Grammar
-       
-        print("\nPredictive Parsing Table:")
+        if log:
+            self.print_predictive_table()
+
+    def construct_table_row(self, lhs, log=None, conflicts=None):
+        """Sparse predictive table row {terminal: production} of one non-terminal.
+
+        Built from the current FIRST/FOLLOW sets; empty cells are left out and
+        a cell claimed twice keeps the last production. When a `conflicts` set
+        is given, every cell claimed by more than one production is added to
+        it as a Conflict, detected while the row is filled.
+        """
+        row = {}
+        claims = {}  # terminal -> {production tuple: claimed only through FOLLOW}
+        contested = []  # terminals claimed by a second production, in order
+        for production in self.productions[lhs]:
+            first_set = self.compute_first_for_production(production)  # Compute FIRST for the right-hand side
+            if log:
+                log(production, first_set)
+            key = tuple(production)
+
+            # Rule 1: Fill in the table using FIRST
+            for terminal in first_set:
+                # The 'ε' column is for display only; two nullable alternatives
+                # collide on the FOLLOW terminals claimed below instead
+                if conflicts is not None and terminal != 'ε':
+                    self._claim(claims, contested, terminal, key, False)
+                row[terminal] = production
+
+            # Rule 2: Handle ε in FIRST and fill with FOLLOW ($ included)
+            if 'ε' in first_set:
+                for terminal in self.follow[lhs]:
+                    if conflicts is not None:
+                        self._claim(claims, contested, terminal, key, True)
+                    row[terminal] = production
+
+        for terminal in contested:
+            cell = claims[terminal]
+            kind = "FIRST/FOLLOW" if any(cell.values()) else "FIRST/FIRST"
+            conflicts.add(Conflict(lhs, terminal, tuple(cell), kind))
+        return row
+
+    @staticmethod
+    def _claim(claims, contested, terminal, production, via_follow):
+        cell = claims.get(terminal)
+        if cell is None:
+            claims[terminal] = {production: via_follow}
+        elif production in cell:
+            cell[production] = cell[production] and via_follow
+        else:
+            if len(cell) == 1:
+                contested.append(terminal)
+            cell[production] = via_follow
+
+    def print_predictive_table(self):
+        log = self.tracer.log
+        log("\nPredictive Parsing Table:")
         terminals = sorted(self.terminals)  # Make sure to use the full set of terminals
         
         # Print header
-        print("   ", end="")
+        log("   ", end="")
         for terminal in (terminals ):
-            print(f"{terminal:>10}", end="")
-        print()
+            log(f"{terminal:>10}", end="")
+        log()
     
         # Print table contents
         for lhs in self.predictive_table:
-            print(f"{lhs:>2}:", end="")
+            log(f"{lhs:>2}:", end="")
             for terminal in terminals:
                 production = self.predictive_table[lhs].get(terminal, "nil")  # Default to "nil" if no production
                 production_str = ' '.join(production) if isinstance(production, list) else production
-                print(f"{production_str:>10}", end="")
-            print()
+                log(f"{production_str:>10}", end="")
+            log()
+
+    def compile(self):
+        """Returns the integer-indexed form of the predictive table (built once per table)"""
+        if self.compiled is None:
+            if self.stats is None:
+                self.compiled = CompiledGrammar(self)
+            else:
+                with self.stats.phase("compile"):
+                    self.compiled = CompiledGrammar(self)
+        return self.compiled
 
   
 
 class PredictiveParser:
-    def __init__(self, grammar):
+    def __init__(self, grammar, tracer=None, stats=None):
         self.grammar = grammar
+        self.tracer = tracer or grammar.tracer
+        self.stats = stats if stats is not None else grammar.stats  # optional profiling.ParseStats
         self.stack = []
         self.input_string = []
+        self.tree = None  # ParseTree of the last parse_compiled(..., build_tree=True)
+        self.errors = []  # (position, message) list of the last parse_all()
         
     def handle_error(self, top):
-        print(f"\nError: No rule for {top} with input '{self.input_string[0]}'.")
+        if self.tracer.steps:
+            self.tracer.error(f"\nError: No rule for {top} with input '{self.input_string[0]}'.")
         self.panic_mode_recovery()  # Call panic mode recovery
 
     def panic_mode_recovery(self):
+        trace = self.tracer.steps
         while self.input_string and self.input_string[0] not in self.grammar.follow[self.stack[-1]]:
-            print(f"Skipping: {self.input_string[0]}")
+            if trace:
+                self.tracer.recover(self.input_string[0])
             self.input_string.pop(0)  # Skip the current input symbol
 
+    def fail(self, message):
+        if self.tracer.steps:
+            self.tracer.error(message)
+        return message
+
+    @timed("parse")
     def parse(self, input_string):
+        """Parses a token list; returns the result string.
+
+        Without a step tracer this runs the grammar's CompiledGrammar, in time
+        linear in the input. With one, the table-driven loop below reports
+        every step; both give the same result, stack and remaining input.
+        """
+        tracer = self.tracer
+        if not tracer.steps:
+            compiled = self.grammar.compile()
+            result, stack, position = compiled.run(input_string, None, self.stats)
+            self.stack = [compiled.symbols[symbol] for symbol in stack]
+            self.input_string = list(input_string[position:]) + ['$']
+            return result
+
+        stats = self.stats
         #The input string to parse:
-        print("\nParsing : ",end="")
-        print(' '.join(input_string))
-            
-            
+        if tracer.debug:
+            tracer.log("\nParsing : ",end="")
+            tracer.log(' '.join(input_string))
             
         self.stack = [self.grammar.start_symbol] # Add end marker to stack
-        self.input_string = input_string + ['$']  # Add end marker
+        tokens = list(input_string) + ['$']  # Add end marker
+        position = 0  # Index of the current input symbol
+        self.input_string = tokens
+        if stats is not None:
+            stats.record_parse(len(input_string), 1)
+            chain = 0  # ε-expansions since the last match
 
-        while self.stack:
-            top = self.stack.pop()
-            print(f"\n*Stack: {''.join(self.stack)}\t Input: {''.join(self.input_string)}\t Top: {top}")
+        try:
+            while self.stack:
+                top = self.stack.pop()
+                current_input = tokens[position]
+                if tracer.debug:
+                    tracer.log(f"\n*Stack: {''.join(self.stack)}\t Input: {''.join(tokens[position:])}\t Top: {top}")
 
-            #Empty string
-            if top == '$' and self.input_string[0] == '$':
-                return "Input parsed successfully."
-        
-            # Just remove epsilon from stack
-            if top == 'ε':  
-                continue
+                #Empty string
+                if top == '$' and current_input == '$':
+                    return "Input parsed successfully."
+
+                # Just remove epsilon from stack
+                if top == 'ε':
+                    continue
+
+                # Case: Non-terminal
+                if top in self.grammar.productions:
+                    row = self.grammar.parse_table[top]
+                    if current_input in row or current_input in self.grammar.terminals:
+                        production = row.get(current_input, "nil")
+                        if production == "nil":
+                            return self.fail(f"\nError: No production for {top} with input '{current_input}'")
+
+                        tracer.expand(top, production, current_input)
+                        if production != ['ε']:
+                            self.stack.extend(reversed(production))  # Push production to stack
+                        if stats is not None:
+                            stats.record_expansion(top, current_input, production)
+                            chain += production == ['ε']
+                            stats.record_depth(len(self.stack), chain)
+                    else:
+                        return self.fail(f"\nError: No rule for {top} with input '{current_input}'")
+
+                 # Case: Terminal Match - cancels out
+                elif top == current_input:
+                    tracer.match(top)
+                    position += 1
+                    if stats is not None:
+                        chain = 0
 
-            # Case: Non-terminal
-            if top in self.grammar.productions: 
-                current_input = self.input_string[0]
-                if current_input in self.grammar.predictive_table[top]:
-                    production = self.grammar.predictive_table[top][current_input]
-                    if production == "nil":
-                        return f"\nError: No production for {top} with input '{current_input}'"
-
-                    print("\n>>Production found",production)
-                    if production != ['ε']:
-                        self.stack.extend(reversed(production))  # Push production to stack
-                    # print(f"\n*Stack: {''.join(self.stack)}\t Input: {''.join(self.input_string)}\t Top: {top}")
                 else:
-                    return f"\nError: No rule for {top} with input '{current_input}'"
-                
-             # Case: Terminal Match - cancels out
-            elif top == self.input_string[0]: 
-                print("\n>>Match found ", top)
-                self.input_string.pop(0)
-                
+                    return self.fail(f"\nError: Expected '{top}', found '{current_input}'")
+
+            return "Input not fully consumed." if tokens[position] != '$' else "Input parsed successfully."
+        finally:
+            self.input_string = tokens[position:]
+
+    @timed("parse_compiled")
+    def parse_compiled(self, input_string, build_tree=False):
+        """Same result as parse(), driven by the grammar's CompiledGrammar in linear time.
+
+        With build_tree the parse tree is recorded into self.tree in the same pass.
+        """
+        compiled = self.grammar.compile()
+        if build_tree:
+            result, stack, position, self.tree = compiled.run_tree(input_string, self.tracer, self.stats)
+        else:
+            result, stack, position = compiled.run(input_string, self.tracer, self.stats)
+        self.stack = [compiled.symbols[symbol] for symbol in stack]
+        self.input_string = list(input_string[position:]) + ['$']
+        return result
+
+    @timed("parse_stream")
+    def parse_stream(self, tokens):
+        """Parses any iterable of tokens without buffering it; stops reading at the first error"""
+        stream = StreamingParser(self.grammar, self.tracer)
+        stream.feed(tokens)
+        result = stream.finish()
+        self.stack = stream.stack_symbols()
+        self.input_string = []
+        return result
+
+    @timed("parse_file")
+    def parse_file(self, path, lexer=None):
+        """Parses a file through a memory map, scanning tokens in place with the grammar's Lexer.
+
+        No token list is built. Errors carry the line, column and byte offset
+        of the token where parsing stopped.
+        """
+        self.stack = []
+        self.input_string = []
+        lexer = lexer or Lexer.from_grammar(self.grammar)
+        stream = StreamingParser(self.grammar, self.tracer)
+        with open(path, "rb") as f:
+            size = f.seek(0, 2)
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+            try:
+                offset = size
+                terminal_ids = stream.compiled.terminal_ids
+                step = stream._step
+                try:
+                    for terminal, start, _ in lexer.scan(buffer):
+                        result = step(terminal_ids.get(terminal, CompiledGrammar.UNKNOWN), terminal)
+                        if result is not None:
+                            stream.result = result
+                            offset = start
+                            break
+                except LexError as e:
+                    result = f"\nError: {e}"
+                else:
+                    result = stream.finish()
+                    if result != "Input parsed successfully.":
+                        line, column = line_and_column(buffer, offset)
+                        result = f"{result.rstrip('.')} at line {line}, column {column} (byte offset {offset})"
+            finally:
+                if size:
+                    buffer.close()
+        self.stack = stream.stack_symbols()
+        self.input_string = []
+        return result
+
+    @timed("parse_all")
+    def parse_all(self, input_string, max_errors=100):
+        """Parses with panic-mode recovery and returns every syntax error as (token position, message).
+
+        An empty list means the input parsed successfully. Parsing stops
+        after max_errors errors.
+        """
+        self.errors = self.grammar.compile().run_recovering(input_string, max_errors, self.tracer)
+        return self.errors
+
+
+class StreamingParser:
+    """Push-based LL(1) parser over a Grammar's CompiledGrammar.
+
+    Tokens are handed over with feed() as they arrive and the end of input is
+    signalled with finish(). Only the parse stack is kept in memory. Once the
+    outcome is known (first error, or the start symbol fully matched) feed()
+    stops reading and returns the result; until then it returns None.
+    """
+    def __init__(self, grammar, tracer=None):
+        self.compiled = grammar.compile()
+        self.tracer = tracer or grammar.tracer
+        self.stack = [self.compiled.start]
+        self.position = 0  # tokens consumed so far
+        self.result = None
+
+    def feed(self, tokens):
+        if self.result is not None:
+            return self.result
+        compiled = self.compiled
+        terminal_ids = compiled.terminal_ids
+        unknown = compiled.UNKNOWN
+        step = self._step
+        for token in tokens:
+            result = step(terminal_ids.get(token, unknown), token)
+            if result is not None:
+                self.result = result
+                break
+        return self.result
+
+    def finish(self):
+        if self.result is None:
+            self.result = self._step(self.compiled.end, '$')
+        return self.result
+
+    def fail(self, message):
+        if self.tracer.steps:
+            self.tracer.error(message)
+        return message
+
+    def stack_symbols(self):
+        return [self.compiled.symbols[symbol] for symbol in self.stack]
+
+    def _step(self, current, token):
+        """Runs the parser until `current` is consumed; returns the result once decided"""
+        compiled = self.compiled
+        base = compiled.base
+        check = compiled.check
+        value = compiled.value
+        productions = compiled.productions
+        n_terminals = compiled.n_terminals
+        width = compiled.width
+        stack = self.stack
+        pop = stack.pop
+        tracer = self.tracer
+        trace = tracer.steps
+
+        while stack:
+            top = pop()
+            if top >= n_terminals:  # Non-terminal
+                if not 0 <= current < width:
+                    return self.fail(f"\nError: No rule for {compiled.symbols[top]} with input '{token}'")
+                index = base[top] + current
+                rule = value[index] if check[index] == top else -1
+                if rule < 0:
+                    return self.fail(f"\nError: No production for {compiled.symbols[top]} with input '{token}'")
+                if trace:
+                    tracer.expand(compiled.symbols[top], compiled.rules[rule], token)
+                stack.extend(productions[rule])
+            elif top == current:
+                if top == compiled.end:
+                    return "Input parsed successfully."
+                if trace:
+                    tracer.match(token)
+                self.position += 1
+                return None
             else:
-                return f"\nError: Expected '{top}', found '{self.input_string[0]}'"
+                return self.fail(f"\nError: Expected '{compiled.symbols[top]}', found '{token}'")
+
+        return "Input not fully consumed." if current != compiled.end else "Input parsed successfully."
 
-        return "Input not fully consumed." if self.input_string[0] != '$' else "Input parsed successfully."
+
+class IncrementalParser:
+    """Re-parses an edited token list from checkpoints of the parser state.
+
+    parse() runs the compiled engine over the whole list and records the
+    stack every `interval` matched tokens. edit(start, end, tokens) splices
+    the list, resumes from the last checkpoint at or before `start`, and
+    stops as soon as it reaches a checkpoint of the previous run past the
+    edit with an identical stack: from there both runs see the same stack
+    and the same remaining tokens, so the previous outcome is reused. The
+    parsing work per edit is proportional to the edit plus the distance to
+    the surrounding checkpoints. Splicing the token list is still O(n) and
+    shifting the later checkpoints O(n / interval), but both are list
+    copies rather than parser steps. Results equal parse_compiled() on the
+    list.
+    """
+    def __init__(self, grammar, interval=256):
+        self.compiled = grammar.compile()
+        self.interval = interval
+        self.tokens = []
+        self.positions = []  # checkpoint positions, increasing
+        self.stacks = []  # stack id tuple at each checkpoint, after matching tokens[:position]
+        self.result = None
+        self.stack = []  # remaining stack ids of the last run
+        self.position = 0  # tokens consumed by the last run
+        self.reparsed = 0  # tokens matched again by the last parse() or edit()
+
+    def parse(self, tokens):
+        self.tokens = list(tokens)
+        self.positions = []
+        self.stacks = []
+        return self._run([self.compiled.start], 0, [], None, 0)
+
+    def edit(self, start, end, tokens):
+        """Replaces self.tokens[start:end] with `tokens` and re-parses; returns the result"""
+        if self.result is None:
+            raise ValueError("parse() has not been called")
+        if not 0 <= start <= end <= len(self.tokens):
+            raise IndexError(f"Edit range {start}:{end} outside 0:{len(self.tokens)}")
+        tokens = list(tokens)
+        delta = len(tokens) - (end - start)
+        self.tokens[start:end] = tokens
+        if start > self.position:
+            # The outcome was decided by tokens before the edit
+            self.reparsed = 0
+            return self.result
+
+        i = bisect_right(self.positions, start) - 1
+        later = [(position + delta, stack) for position, stack in zip(self.positions[i + 1:], self.stacks[i + 1:])
+                 if position >= end]
+        previous = (self.result, self.stack, self.position + delta)
+        resume_position = self.positions[i]
+        resume_stack = list(self.stacks[i])
+        del self.positions[i + 1:]
+        del self.stacks[i + 1:]
+        return self._run(resume_stack, resume_position, later, previous, resume_position)
+
+    def _run(self, stack, position, later, previous, resumed_from):
+        """compiled.run() from a checkpoint, recording new checkpoints and stopping at a matching old one"""
+        compiled = self.compiled
+        tokens = self.tokens
+        terminal_ids = compiled.terminal_ids
+        base = compiled.base
+        check = compiled.check
+        value = compiled.value
+        productions = compiled.productions
+        symbols = compiled.symbols
+        n_terminals = compiled.n_terminals
+        width = compiled.width
+        end = compiled.end
+        unknown = compiled.UNKNOWN
+        positions = self.positions
+        stacks = self.stacks
+        interval = self.interval
+
+        if not positions:
+            positions.append(position)
+            stacks.append(tuple(stack))
+        next_snapshot = positions[-1] + interval
+        j = 0
+        checkpoint = min(next_snapshot, later[0][0]) if later else next_snapshot
+
+        n = len(tokens)
+        current = terminal_ids.get(tokens[position], unknown) if position < n else end
+        pop = stack.pop
+        extend = stack.extend
+        result = None
+        while stack:
+            top = pop()
+            if top >= n_terminals:  # Non-terminal
+                if not 0 <= current < width:
+                    token = tokens[position] if position < n else '$'
+                    result = f"\nError: No rule for {symbols[top]} with input '{token}'"
+                    break
+                index = base[top] + current
+                rule = value[index] if check[index] == top else -1
+                if rule < 0:
+                    token = tokens[position] if position < n else '$'
+                    result = f"\nError: No production for {symbols[top]} with input '{token}'"
+                    break
+                extend(productions[rule])
+            elif top == current:
+                if top == end:
+                    result = "Input parsed successfully."
+                    break
+                position += 1
+                current = terminal_ids.get(tokens[position], unknown) if position < n else end
+                if position >= checkpoint:
+                    while j < len(later) and later[j][0] < position:
+                        j += 1
+                    if j < len(later) and later[j][0] == position:
+                        if tuple(stack) == later[j][1]:  # Same state as the previous run from here on
+                            for old_position, old_stack in later[j:]:
+                                positions.append(old_position)
+                                stacks.append(old_stack)
+                            self.result, old_final_stack, self.position = previous
+                            self.stack = list(old_final_stack)
+                            self.reparsed = position - resumed_from
+                            return self.result
+                        j += 1
+                    if position >= next_snapshot:
+                        positions.append(position)
+                        stacks.append(tuple(stack))
+                        next_snapshot = position + interval
+                    checkpoint = min(next_snapshot, later[j][0]) if j < len(later) else next_snapshot
+            else:
+                token = tokens[position] if position < n else '$'
+                result = f"\nError: Expected '{symbols[top]}', found '{token}'"
+                break
+
+        if result is None:
+            result = "Input not fully consumed." if current != end else "Input parsed successfully."
+        self.result = result
+        self.stack = stack
+        self.position = position
+        self.reparsed = position - resumed_from
+        return result
+
+
+class CompiledGrammar:
+    """Integer-indexed snapshot of a Grammar's predictive table.
+
+    Terminals are interned to 0..T-1 (table columns first) and non-terminals
+    to T..T+N-1. The table is row-displacement packed: the filled cells of
+    non-terminal A live at base[A] + terminal in the shared `value` array,
+    and are A's only where `check` at that index equals A; anything else is
+    an empty (NIL) cell. Lookup stays O(1) while memory grows with the filled
+    cells rather than with N * T. Productions are stored pre-reversed as
+    tuples of symbol ids with ε dropped, so an expansion is a single
+    stack.extend().
+    """
+    NIL = -1
+    UNKNOWN = -1  # id of a token that is not a terminal of the grammar
+
+    def __init__(self, grammar):
+        table = grammar.parse_table
+        if not table:
+            raise ValueError("Predictive table has not been constructed")
+
+        columns = set(grammar.terminals)
+        for row in table.values():
+            columns.update(row)
+        columns.add('$')
+        terminals = sorted(columns)
+        self.width = len(terminals)
+
+        # Terminals used by productions but missing from the table columns
+        # still match input tokens; they just never select a table cell.
+        extra = set()
+        for row in table.values():
+            for production in row.values():
+                extra.update(sym for sym in production if sym not in table and sym != 'ε')
+        terminals.extend(sorted(extra - columns))
+
+        self.n_terminals = len(terminals)
+        self.symbols = terminals + list(table)
+        self.terminal_ids = {sym: i for i, sym in enumerate(terminals)}
+        self.non_terminal_ids = {sym: self.n_terminals + i for i, sym in enumerate(table)}
+        self.end = self.terminal_ids['$']
+        self.start = self.non_terminal_ids[grammar.start_symbol]
+
+        self.productions = []  # pre-reversed symbol id tuples
+        self.rules = []  # the original productions, same index
+        production_ids = {}
+        rows = {}  # non-terminal id -> sorted [(terminal id, production index)]
+        for lhs, row in table.items():
+            cells = []
+            for terminal, production in row.items():
+                key = tuple(production)
+                if key not in production_ids:
+                    production_ids[key] = len(self.productions)
+                    self.productions.append(tuple(self.symbol_id(sym) for sym in reversed(key) if sym != 'ε'))
+                    self.rules.append(production)
+                cells.append((self.terminal_ids[terminal], production_ids[key]))
+            rows[self.non_terminal_ids[lhs]] = sorted(cells)
+        self.pack(rows)
+
+        # Panic-mode synchronization set of each non-terminal: FOLLOW ∪ {$}
+        self.sync = [
+            frozenset({self.end} | {self.terminal_ids[t] for t in grammar.follow.get(lhs, ()) if t in self.terminal_ids})
+            for lhs in table
+        ]
+
+    def pack(self, rows):
+        """Overlays the rows first-fit, fullest first, into base/check/value"""
+        base = [0] * len(self.symbols)
+        check = []
+        value = []
+        used = bytearray()  # 1 where check is taken; find() skips to the next free slot in C
+        first_free = 0
+        for non_terminal in sorted(rows, key=lambda symbol: -len(rows[symbol])):
+            cells = rows[non_terminal]
+            if not cells:
+                continue  # Every lookup misses: no check entry names this row
+            first_column = cells[0][0]
+            slot = max(first_free, first_column)
+            while True:
+                slot = used.find(0, slot)
+                if slot < 0:  # Past the end everything is free
+                    offset = max(len(used) - first_column, 0)
+                    break
+                offset = slot - first_column
+                if all(offset + column >= len(used) or not used[offset + column] for column, _ in cells):
+                    break
+                slot += 1
+            size = offset + cells[-1][0] + 1
+            if size > len(check):
+                grow = size - len(check)
+                check.extend([self.NIL] * grow)
+                value.extend([self.NIL] * grow)
+                used.extend(bytes(grow))
+            for column, rule in cells:
+                check[offset + column] = non_terminal
+                value[offset + column] = rule
+                used[offset + column] = 1
+            base[non_terminal] = offset
+            first_free = used.find(0, first_free)
+            if first_free < 0:
+                first_free = len(used)
+        # Any base + column with column < width must be a valid index
+        size = max(base) + self.width
+        if size > len(check):
+            check.extend([self.NIL] * (size - len(check)))
+            value.extend([self.NIL] * (size - len(value)))
+        self.base = array('i', base)
+        self.check = array('i', check)
+        self.value = array('i', value)
+
+    def lookup(self, non_terminal, terminal):
+        """Production index in the cell of two symbol ids, or NIL"""
+        index = self.base[non_terminal] + terminal
+        return self.value[index] if self.check[index] == non_terminal else self.NIL
+
+    def symbol_id(self, symbol):
+        if symbol in self.non_terminal_ids:
+            return self.non_terminal_ids[symbol]
+        return self.terminal_ids[symbol]
+
+    def run(self, tokens, tracer=None, stats=None):
+        """Parses a token sequence; returns (result, remaining stack ids, tokens consumed)"""
+        if tracer is not None and tracer.steps:
+            return self.run_traced(tokens, tracer)
+        if stats is not None:
+            return self.run_profiled(tokens, stats)
+        terminal_ids = self.terminal_ids
+        base = self.base
+        check = self.check
+        value = self.value
+        productions = self.productions
+        symbols = self.symbols
+        n_terminals = self.n_terminals
+        width = self.width
+        end = self.end
+        unknown = self.UNKNOWN
+
+        n = len(tokens)
+        position = 0
+        current = terminal_ids.get(tokens[0], unknown) if n else end
+        stack = [self.start]
+        pop = stack.pop
+        extend = stack.extend
+
+        while stack:
+            top = pop()
+            if top >= n_terminals:  # Non-terminal
+                if not 0 <= current < width:
+                    token = tokens[position] if position < n else '$'
+                    return f"\nError: No rule for {symbols[top]} with input '{token}'", stack, position
+                index = base[top] + current
+                rule = value[index] if check[index] == top else -1
+                if rule < 0:
+                    token = tokens[position] if position < n else '$'
+                    return f"\nError: No production for {symbols[top]} with input '{token}'", stack, position
+                extend(productions[rule])
+            elif top == current:
+                if top == end:
+                    return "Input parsed successfully.", stack, position
+                position += 1
+                current = terminal_ids.get(tokens[position], unknown) if position < n else end
+            else:
+                token = tokens[position] if position < n else '$'
+                return f"\nError: Expected '{symbols[top]}', found '{token}'", stack, position
+
+        result = "Input not fully consumed." if current != end else "Input parsed successfully."
+        return result, stack, position
+
+
+    def run_profiled(self, tokens, stats):
+        """run() counting table-cell hits, ε-expansions and stack depth into a ParseStats"""
+        terminal_ids = self.terminal_ids
+        base = self.base
+        check = self.check
+        value = self.value
+        productions = self.productions
+        symbols = self.symbols
+        n_terminals = self.n_terminals
+        width = self.width
+        end = self.end
+        unknown = self.UNKNOWN
+
+        n = len(tokens)
+        position = 0
+        current = terminal_ids.get(tokens[0], unknown) if n else end
+        stack = [self.start]
+        pop = stack.pop
+        extend = stack.extend
+        hits = {}  # table index -> expansions
+        max_depth = 1
+        chain = max_chain = 0
+
+        try:
+            while stack:
+                top = pop()
+                if top >= n_terminals:  # Non-terminal
+                    if not 0 <= current < width:
+                        token = tokens[position] if position < n else '$'
+                        return f"\nError: No rule for {symbols[top]} with input '{token}'", stack, position
+                    index = base[top] + current
+                    rule = value[index] if check[index] == top else -1
+                    if rule < 0:
+                        token = tokens[position] if position < n else '$'
+                        return f"\nError: No production for {symbols[top]} with input '{token}'", stack, position
+                    hits[index] = hits.get(index, 0) + 1
+                    production = productions[rule]
+                    if production:
+                        extend(production)
+                        if len(stack) > max_depth:
+                            max_depth = len(stack)
+                    else:
+                        chain += 1
+                        if chain > max_chain:
+                            max_chain = chain
+                elif top == current:
+                    if top == end:
+                        return "Input parsed successfully.", stack, position
+                    position += 1
+                    current = terminal_ids.get(tokens[position], unknown) if position < n else end
+                    chain = 0
+                else:
+                    token = tokens[position] if position < n else '$'
+                    return f"\nError: Expected '{symbols[top]}', found '{token}'", stack, position
+
+            result = "Input not fully consumed." if current != end else "Input parsed successfully."
+            return result, stack, position
+        finally:
+            self.record_stats(stats, n, hits, max_depth, max_chain)
+
+    def record_stats(self, stats, tokens, hits, max_depth, max_chain):
+        """Adds one parse, with its table-cell hits ({table index: expansions}), to a ParseStats"""
+        for index, count in hits.items():
+            non_terminal = self.check[index]
+            stats.record_expansion(self.symbols[non_terminal], self.symbols[index - self.base[non_terminal]],
+                                   self.rules[self.value[index]], count)
+        stats.record_parse(tokens, max_depth, max_chain)
+
+    def run_traced(self, tokens, tracer):
+        """run() reporting every expansion, match and error to `tracer`"""
+        terminal_ids = self.terminal_ids
+        symbols = self.symbols
+        n_terminals = self.n_terminals
+        width = self.width
+        end = self.end
+
+        n = len(tokens)
+        position = 0
+        current = terminal_ids.get(tokens[0], self.UNKNOWN) if n else end
+        stack = [self.start]
+
+        while stack:
+            top = stack.pop()
+            token = tokens[position] if position < n else '$'
+            if tracer.debug:
+                tracer.log(f"\n*Stack: {''.join(symbols[s] for s in stack)}\t Top: {symbols[top]}\t Input: {token}")
+            if top >= n_terminals:  # Non-terminal
+                if not 0 <= current < width:
+                    message = f"\nError: No rule for {symbols[top]} with input '{token}'"
+                    tracer.error(message)
+                    return message, stack, position
+                rule = self.lookup(top, current)
+                if rule < 0:
+                    message = f"\nError: No production for {symbols[top]} with input '{token}'"
+                    tracer.error(message)
+                    return message, stack, position
+                tracer.expand(symbols[top], self.rules[rule], token)
+                stack.extend(self.productions[rule])
+            elif top == current:
+                if top == end:
+                    return "Input parsed successfully.", stack, position
+                tracer.match(token)
+                position += 1
+                current = terminal_ids.get(tokens[position], self.UNKNOWN) if position < n else end
+            else:
+                message = f"\nError: Expected '{symbols[top]}', found '{token}'"
+                tracer.error(message)
+                return message, stack, position
+
+        result = "Input not fully consumed." if current != end else "Input parsed successfully."
+        return result, stack, position
+
+
+    def run_tree(self, tokens, tracer=None, stats=None):
+        """run() that also records the parse tree; returns (result, stack, position, tree).
+
+        Expansions, matches and errors go to `tracer` like run_traced(), and
+        the counters of run_profiled() to `stats` when given.
+        """
+        trace = tracer is not None and tracer.steps
+        profile = stats is not None
+        hits = {}  # table index -> expansions
+        max_depth = 1
+        chain = max_chain = 0
+        terminal_ids = self.terminal_ids
+        base = self.base
+        check = self.check
+        value = self.value
+        productions = self.productions
+        symbols = self.symbols
+        n_terminals = self.n_terminals
+        width = self.width
+        end = self.end
+        unknown = self.UNKNOWN
+
+        tree = ParseTree(symbols, tokens)
+        add = tree.add
+        first_child = tree.first_child
+        child_count = tree.child_count
+        starts = tree.start
+        ends = tree.end
+
+        n = len(tokens)
+        position = 0
+        current = terminal_ids.get(tokens[0], unknown) if n else end
+        stack = [self.start]
+        nodes = [add(self.start, -1, 0)]  # tree node of each stack entry
+
+        result = None
+        while stack:
+            top = stack.pop()
+            node = nodes.pop()
+            if top >= n_terminals:  # Non-terminal
+                if not 0 <= current < width:
+                    token = tokens[position] if position < n else '$'
+                    result = f"\nError: No rule for {symbols[top]} with input '{token}'"
+                    break
+                index = base[top] + current
+                rule = value[index] if check[index] == top else -1
+                if rule < 0:
+                    token = tokens[position] if position < n else '$'
+                    result = f"\nError: No production for {symbols[top]} with input '{token}'"
+                    break
+                if trace:
+                    tracer.expand(symbols[top], self.rules[rule], tokens[position] if position < n else '$')
+                starts[node] = ends[node] = position
+                production = productions[rule]
+                count = len(production)
+                if count:
+                    first = len(tree)
+                    for sym in reversed(production):
+                        add(sym, node, position)
+                    first_child[node] = first
+                    child_count[node] = count
+                    stack.extend(production)
+                    nodes.extend(range(first + count - 1, first - 1, -1))
+                if profile:
+                    hits[index] = hits.get(index, 0) + 1
+                    if not count:
+                        chain += 1
+                        if chain > max_chain:
+                            max_chain = chain
+                    elif len(stack) > max_depth:
+                        max_depth = len(stack)
+            elif top == current:
+                starts[node] = position
+                ends[node] = position + 1
+                if top == end:
+                    result = "Input parsed successfully."
+                    break
+                if trace:
+                    tracer.match(tokens[position])
+                chain = 0
+                position += 1
+                current = terminal_ids.get(tokens[position], unknown) if position < n else end
+            else:
+                token = tokens[position] if position < n else '$'
+                result = f"\nError: Expected '{symbols[top]}', found '{token}'"
+                break
+
+        if result is None:
+            result = "Input not fully consumed." if current != end else "Input parsed successfully."
+        elif trace and result.startswith("\nError"):
+            tracer.error(result)
+        tree.close_spans()
+        if profile:
+            self.record_stats(stats, n, hits, max_depth, max_chain)
+        return result, stack, position, tree
+
+
+    def run_recovering(self, tokens, max_errors=100, tracer=None):
+        """Parses with panic-mode recovery; returns the list of (position, message) errors.
+
+        On an empty cell for non-terminal A the parser skips tokens until one
+        that A can start with (A is retried) or one in A's synchronization set
+        (A is dropped). A mismatched terminal is dropped as if inserted. When
+        the stack empties before the input, the parser skips to a token that
+        can start the start symbol and parses again from there (reporting
+        "Input not fully consumed." unless that token already has an error). Every step
+        consumes a token or pops the stack, so the cost stays linear.
+        """
+        terminal_ids = self.terminal_ids
+        base = self.base
+        check = self.check
+        value = self.value
+        productions = self.productions
+        symbols = self.symbols
+        sync = self.sync
+        n_terminals = self.n_terminals
+        width = self.width
+        end = self.end
+        unknown = self.UNKNOWN
+        trace = tracer is not None and tracer.steps
+
+        errors = []
+        n = len(tokens)
+        position = 0
+        current = terminal_ids.get(tokens[0], unknown) if n else end
+        start = self.start
+        start_base = base[start]
+        stack = [self.start]
+
+        while True:
+            if not stack:
+                if current == end:
+                    return errors
+                # Recovery may have just dropped the start symbol at this token;
+                # its error already covers the position
+                if not errors or errors[-1][0] != position:
+                    errors.append((position, "Input not fully consumed."))
+                    if trace:
+                        tracer.error("Input not fully consumed.")
+                    if len(errors) >= max_errors:
+                        return errors
+                while True:
+                    if trace:
+                        tracer.recover(tokens[position])
+                    position += 1
+                    current = terminal_ids.get(tokens[position], unknown) if position < n else end
+                    if current == end:
+                        return errors
+                    if 0 <= current < width and check[start_base + current] == start:
+                        break
+                stack.append(start)
+            top = stack.pop()
+            if top >= n_terminals:  # Non-terminal
+                row = base[top]
+                if 0 <= current < width:
+                    if check[row + current] == top:
+                        stack.extend(productions[value[row + current]])
+                        continue
+                    kind = "No production"
+                else:
+                    kind = "No rule"
+                token = tokens[position] if position < n else '$'
+                message = f"\nError: {kind} for {symbols[top]} with input '{token}'"
+                errors.append((position, message))
+                if trace:
+                    tracer.error(message)
+                if len(errors) >= max_errors:
+                    return errors
+                # Panic mode: skip to a token that restarts or follows `top`
+                while current != end and current not in sync[top - n_terminals]:
+                    if trace:
+                        tracer.recover(tokens[position])
+                    position += 1
+                    current = terminal_ids.get(tokens[position], unknown) if position < n else end
+                    if 0 <= current < width and check[row + current] == top:
+                        stack.append(top)
+                        break
+            elif top == current:
+                if top == end:
+                    return errors
+                position += 1
+                current = terminal_ids.get(tokens[position], unknown) if position < n else end
+            else:
+                token = tokens[position] if position < n else '$'
+                message = f"\nError: Expected '{symbols[top]}', found '{token}'"
+                errors.append((position, message))
+                if trace:
+                    tracer.error(message)
+                if len(errors) >= max_errors:
+                    return errors
 
 
 # Example usage
@@ -454,7 +1588,7 @@ class PredictiveParser:
 print("Given Grammar: ")
 prod = "S->( L )|a; L-> L , S|S"   #Take care of Input method always!
 
-grammar = Grammar(prod)
+grammar = Grammar(prod, tracer=Tracer(Tracer.DEBUG))
 grammar.remove_left_recursion() #DONE
 grammar.remove_common_prefixes()    #DONE
 
@@ -479,4 +1613,4 @@ F -> i | ( E );
 
 S->(  L  )| a; 
 L-> L ,  S | S
-"""    
\ No newline at end of file
+"""    